@@ -0,0 +1,101 @@
+"""Compare two benchmark reports, typically of a base commit and of a change.
+
+Run `python -m benchmarks.compare benchmarks/results/table_state-<base>.json
+benchmarks/results/table_state-<head>.json`. Results are matched on their parameters, costs which
+grew and throughputs which dropped by more than the threshold are marked as regressions, so is
+any cost which grew from zero. Counts are workload sizes, they are shown but never regressions,
+except for error counts which are costs.
+"""
+
+import argparse
+import json
+import math
+from pathlib import Path
+from typing import Any
+
+# Metrics are the numbers whose name ends with a unit, the other fields identify the result
+METRIC_SUFFIXES = ("_ms", "_bytes", "_mb", "_kb", "_seconds", "_per_second", "_per_session", "_count")
+# Metrics for which higher is better, a drop is a regression
+HIGHER_IS_BETTER_SUFFIXES = ("_per_second",)
+# Metrics which are not costs, their changes are never regressions
+UNRANKED_SUFFIXES = ("_count",)
+# Counts which are costs, they are ranked like the other costs
+COST_COUNT_SUFFIXES = ("error_count",)
+DEFAULT_THRESHOLD = 0.2
+
+
+def _is_metric(name: str) -> bool:
+    return name.endswith(METRIC_SUFFIXES)
+
+
+def _is_regression(name: str, change: float, threshold: float) -> bool:
+    if name.endswith(UNRANKED_SUFFIXES) and not name.endswith(COST_COUNT_SUFFIXES):
+        return False
+    if name.endswith(HIGHER_IS_BETTER_SUFFIXES):
+        return -change > threshold
+    return change > threshold
+
+
+def _key(result: dict[str, Any]) -> tuple[tuple[str, Any], ...]:
+    return tuple((name, value) for name, value in result.items() if not _is_metric(name))
+
+
+def compare(base: dict[str, Any], head: dict[str, Any], threshold: float = DEFAULT_THRESHOLD) -> list[dict[str, Any]]:
+    """Relative change of every metric of the results found in both reports."""
+    base_results = {_key(result): result for result in base["results"]}
+    changes = []
+    for result in head["results"]:
+        base_result = base_results.get(_key(result))
+        if base_result is None:
+            continue
+        for name, value in result.items():
+            if not _is_metric(name) or base_result.get(name) is None:
+                continue
+            if base_result[name]:
+                change = value / base_result[name] - 1
+            else:
+                # Any growth from zero is unbounded, a cost appearing is always a regression
+                change = math.inf if value > 0 else 0.0
+            changes.append(
+                {
+                    "result": dict(_key(result)),
+                    "metric": name,
+                    "base": base_result[name],
+                    "head": value,
+                    "change": change,
+                    "regression": _is_regression(name, change, threshold),
+                }
+            )
+    return changes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("base", type=Path)
+    parser.add_argument("head", type=Path)
+    parser.add_argument(
+        "--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative change reported as a regression."
+    )
+    parser.add_argument("--all", action="store_true", help="Show every metric, not only the regressions.")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text())
+    head = json.loads(args.head.read_text())
+    print(f"{base['benchmark']}: {base['commit'] or args.base} -> {head['commit'] or args.head}")
+    changes = compare(base, head, args.threshold)
+    for change in changes:
+        if args.all or change["regression"]:
+            result = " ".join(f"{name}={value}" for name, value in change["result"].items())
+            marker = "REGRESSION" if change["regression"] else ""
+            print(
+                f"{result:<48} {change['metric']:<20} {change['base']:>12.3f} -> {change['head']:>12.3f}"
+                f" {change['change']:>+8.1%} {marker}"
+            )
+    regressions = sum(change["regression"] for change in changes)
+    print(f"{regressions} regressions in {len(changes)} metrics")
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""Load test of the app backend with many concurrent sessions.
+
+Run `python -m benchmarks.load_test --sessions 200` from the project root. The app is loaded in
+process with the memory state manager, and each simulated session sends its events through
+`reflex.app.process` as the websocket handler does. No server or external service is needed:
+the connectors are of a fake type whose health checks sleep and sometimes fail, so the status
+poller pushes updates to the sessions while they run.
+
+Every session opens the connectors page, then replays rounds of search, sort, paging and theme
+change events with a random think time between them. The latency of an action is the time until
+its events are processed, chained events included; background events only count until they are
+started, their full latency is in the handler metrics of the report.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import Any
+
+import dill
+import psutil
+from reflex.event import Event, get_hydrate_event
+from reflex.state import BaseState, StateUpdate
+from reflex.utils import format
+
+from benchmarks.report import add_output_argument, latency_summary, write_report
+from craftai.backend.connectors.types.base import BaseConnectorType
+from craftai.entities.config.base import BaseConfig
+from craftai.entities.tool import Tool
+
+FAKE_CONNECTOR_TYPE = "fake"
+CONNECTORS_ROUTE = "/connectors"
+SETTINGS_ROUTE = "/settings"
+
+SEARCH_TERMS = ("connector-00", "connector-0001", "fake", "no such connector")
+RADII = ("none", "small", "medium", "large", "full")
+ACCENT_COLORS = ("tomato", "blue", "grass", "amber", "violet")
+
+
+class FakeConfig(BaseConfig):
+    # Duration of a health check, in seconds
+    delay: float = 0.0
+    failure_rate: float = 0.0
+
+
+class FakeConnectorType(BaseConnectorType[None]):
+    """Connector to nothing, its health checks take `delay` seconds and fail at `failure_rate`."""
+
+    config_class = FakeConfig
+
+    def __init__(self, config: dict[str, Any]):
+        super().__init__(config)
+        self.config = FakeConfig.parse_obj(config)
+
+    def create_client(self) -> None:
+        return None
+
+    def get_tools(self) -> list[Tool]:
+        return []
+
+    def health_check(self) -> bool:
+        time.sleep(self.config.delay)
+        return random.random() >= self.config.failure_rate
+
+
+def _rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 2**20
+
+
+class FakeNamespace:
+    """Stands in for the websocket namespace of the app, it counts the updates pushed to sessions."""
+
+    def __init__(self) -> None:
+        self.token_to_sid: dict[str, str] = {}
+        self.sid_to_token: dict[str, str] = {}
+        self.pushes = 0
+        self.push_bytes = 0
+
+    def connect(self, token: str) -> str:
+        sid = uuid.uuid4().hex
+        self.token_to_sid[token] = sid
+        self.sid_to_token[sid] = token
+        return sid
+
+    async def emit_update(self, update: StateUpdate, sid: str) -> None:
+        self.pushes += 1
+        self.push_bytes += len(format.json_dumps(update.delta).encode()) if update.delta else 0
+
+
+class Session:
+    """A simulated browser tab, it sends the events its page would send."""
+
+    def __init__(self, app: Any, namespace: FakeNamespace, rng: random.Random, think_seconds: float):
+        self.app = app
+        self.token = uuid.uuid4().hex
+        self.sid = namespace.connect(self.token)
+        self.rng = rng
+        self.think_seconds = think_seconds
+        self.route = CONNECTORS_ROUTE
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.delta_bytes = 0
+        self.errors = 0
+
+    async def _dispatch(self, name: str, payload: dict[str, Any]) -> None:
+        event = Event(
+            token=self.token,
+            name=name,
+            payload=payload,
+            router_data={"pathname": self.route, "query": {}},
+        )
+        from reflex.app import process
+
+        chained = []
+        async for update in process(self.app, event, self.sid, {}, "127.0.0.1"):
+            self.delta_bytes += len(format.json_dumps(update.delta).encode()) if update.delta else 0
+            chained.extend(update.events)
+        for chained_event in chained:
+            if chained_event.name.startswith("_"):
+                # Client side events, such as calls of scripts
+                continue
+            await self._dispatch(chained_event.name, chained_event.payload)
+
+    async def action(self, action: str, *events: tuple[str, dict[str, Any]]) -> None:
+        start = time.perf_counter()
+        try:
+            for name, payload in events:
+                await self._dispatch(name, payload)
+        except Exception:
+            self.errors += 1
+        self.latencies[action].append(time.perf_counter() - start)
+        await asyncio.sleep(self.rng.uniform(0, 2 * self.think_seconds))
+
+    async def open(self, route: str) -> None:
+        from reflex.state import OnLoadInternalState, State
+
+        self.route = route
+        await self.action(
+            f"open {route}",
+            (get_hydrate_event(State), {}),
+            (f"{OnLoadInternalState.get_full_name()}.on_load_internal", {}),
+        )
+
+    async def run(self, rounds: int) -> None:
+        from craftai.entities.connector import Connector
+        from craftai.frontend.pages.connectors.list import TableState
+        from craftai.frontend.templates.main import ThemeState
+
+        table = TableState.get_full_name()
+        theme = ThemeState.get_full_name()
+        await self.open(CONNECTORS_ROUTE)
+        for _ in range(rounds):
+            await self.action("search", (f"{table}.set_search_value", {"value": self.rng.choice(SEARCH_TERMS)}))
+            await self.action("clear search", (f"{table}.set_search_value", {"value": ""}))
+            await self.action(
+                "sort", (f"{table}.set_sort_value", {"value": self.rng.choice(Connector.sort_attributes())})
+            )
+            await self.action("toggle sort", (f"{table}.toggle_sort", {}))
+            await self.action("next page", (f"{table}.next_page", {}))
+            await self.action("last page", (f"{table}.last_page", {}))
+            await self.action("first page", (f"{table}.first_page", {}))
+            await self.open(SETTINGS_ROUTE)
+            await self.action("theme change", (f"{theme}.set_radius", {"value": self.rng.choice(RADII)}))
+            await self.action(
+                "theme change",
+                (f"{theme}.setvar", {"var_name": "accent_color", "value": self.rng.choice(ACCENT_COLORS)}),
+            )
+            await self.open(CONNECTORS_ROUTE)
+
+
+def _fake_connectors(count: int, failure_rate: float, max_delay: float, rng: random.Random) -> Iterator[Any]:
+    from craftai.entities.connector import Connector
+
+    for index in range(count):
+        yield Connector(
+            name=f"connector-{index:06d}",
+            connector_type=FAKE_CONNECTOR_TYPE,
+            connector_data={"delay": round(rng.uniform(0, max_delay), 3), "failure_rate": failure_rate},
+        )
+
+
+def _state_bytes(state: BaseState) -> int:
+    """Size of the state and its substates as the Redis state manager would store them."""
+    return len(dill.dumps(state, byref=True)) + sum(_state_bytes(substate) for substate in state.substates.values())
+
+
+async def load_test(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """A summary of the run, then the latencies of the actions and of the handlers."""
+    from craftai.backend.connectors.load import connector_registry
+    from craftai.backend.connectors.store import connectors_source, status_poller
+    from craftai.backend.metrics import metrics
+    from craftai.craftai import app
+
+    rng = random.Random(args.seed)
+    connector_registry.register(FAKE_CONNECTOR_TYPE, f"{__name__}:{FakeConnectorType.__name__}")
+    connectors_source.set_items(_fake_connectors(args.connectors, args.failure_rate, args.check_delay, rng))
+    status_poller.interval = args.poll_interval
+
+    app._enable_state()
+    app._apply_decorated_pages()
+    namespace = FakeNamespace()
+    app.event_namespace = namespace  # type: ignore[assignment]
+    metrics.clear()
+    rss_before = _rss_mb()
+
+    sessions = [
+        Session(app, namespace, random.Random(rng.random()), args.think_ms / 1000) for _ in range(args.sessions)
+    ]
+    start = time.perf_counter()
+
+    async def _run(session: Session, delay: float) -> None:
+        # Sessions connect over the ramp up period, not all at once
+        await asyncio.sleep(delay)
+        await session.run(args.rounds)
+
+    await asyncio.gather(
+        *(_run(session, args.ramp_up * index / len(sessions)) for index, session in enumerate(sessions))
+    )
+    duration = time.perf_counter() - start
+    await status_poller.stop()
+    await asyncio.gather(*app.background_tasks)
+
+    rss_after = _rss_mb()
+    states = list(app.state_manager.states.values())  # type: ignore[attr-defined]
+    latencies: dict[str, list[float]] = defaultdict(list)
+    for session in sessions:
+        for action, seconds in session.latencies.items():
+            latencies[action].extend(seconds)
+    actions = sum(len(seconds) for seconds in latencies.values())
+    summary = {
+        "sessions": args.sessions,
+        "rounds": args.rounds,
+        "connectors": args.connectors,
+        "duration_seconds": duration,
+        "actions_per_second": actions / duration,
+        "error_count": sum(session.errors for session in sessions),
+        "rss_before_mb": rss_before,
+        "rss_after_mb": rss_after,
+        "rss_per_session_kb": (rss_after - rss_before) * 1024 / args.sessions,
+        "state_bytes_per_session": sum(_state_bytes(state) for state in states) / max(len(states), 1),
+        "delta_bytes_per_session": sum(session.delta_bytes for session in sessions) / args.sessions,
+        "push_count": namespace.pushes,
+        "push_bytes": namespace.push_bytes,
+    }
+    return [
+        summary,
+        *(
+            {"action": action, "action_count": len(seconds), **latency_summary(seconds)}
+            for action, seconds in sorted(latencies.items())
+        ),
+        *(
+            {
+                "handler": stats.name,
+                "kind": stats.kind,
+                "call_count": stats.latency.count,
+                "p50_ms": stats.latency.quantile(0.5) * 1000,
+                "p99_ms": stats.latency.quantile(0.99) * 1000,
+                "max_ms": stats.latency.maximum * 1000,
+            }
+            for stats in metrics.snapshot()
+        ),
+    ]
+
+
+def _print_summary(results: list[dict[str, Any]]) -> None:
+    summary, *latencies = results
+    print(
+        f"{summary['sessions']} sessions, {summary['actions_per_second']:.0f} actions/s, "
+        f"{summary['error_count']} errors, RSS {summary['rss_after_mb']:.0f} MB "
+        f"({summary['rss_per_session_kb']:.0f} KB per session), "
+        f"state {summary['state_bytes_per_session'] / 1024:.1f} KB per session, {summary['push_count']} pushes"
+    )
+    print(f"{'action or handler':<72} {'count':>7} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for entry in latencies:
+        name = entry.get("action") or entry["handler"]
+        count = entry.get("action_count") or entry["call_count"]
+        print(f"{name:<72} {count:>7} {entry['p50_ms']:>9.1f} {entry['p99_ms']:>9.1f} {entry['max_ms']:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100, help="Number of concurrent sessions.")
+    parser.add_argument("--rounds", type=int, default=5, help="Rounds of events replayed by every session.")
+    parser.add_argument("--think-ms", type=float, default=50, help="Mean pause of a session between actions.")
+    parser.add_argument("--ramp-up", type=float, default=2, help="Seconds over which the sessions connect.")
+    parser.add_argument("--connectors", type=int, default=1000, help="Number of fake connectors.")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="Share of failing health checks.")
+    parser.add_argument("--check-delay", type=float, default=0.05, help="Maximum duration of a health check.")
+    parser.add_argument("--poll-interval", type=float, default=2, help="Seconds between health checks.")
+    parser.add_argument("--seed", type=int, default=0)
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The connectors are stored in a scratch database, never in the one of the app
+        from craftai.backend.data_source.sqlite import DB_PATH_ENV
+
+        os.environ[DB_PATH_ENV] = os.path.join(directory, "load_test.db")
+        # The handler latencies of the report are recorded by the instrumentation of the app
+        from craftai.frontend.instrumentation import METRICS_ENV
+
+        os.environ[METRICS_ENV] = "1"
+        results = asyncio.run(load_test(args))
+    _print_summary(results)
+    write_report("load_test", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""JSON reports of the benchmarks, kept per commit so that two commits can be compared."""
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+from importlib.metadata import version
+from pathlib import Path
+from typing import Any
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def latency_summary(seconds: list[float]) -> dict[str, float]:
+    ordered = sorted(seconds)
+    return {
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p99_ms": ordered[max(round(len(ordered) * 0.99) - 1, 0)] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+def current_commit() -> str:
+    """Short hash of the checked out commit, with a `+` when the worktree has changes."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        changes = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return commit + ("+" if changes else "")
+
+
+def add_output_argument(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--output",
+        default="",
+        help=f"Path of the JSON report, `-` for stdout. Defaults to a file per commit in {RESULTS_DIR}.",
+    )
+
+
+def write_report(benchmark: str, results: list[dict[str, Any]], output: str = "") -> None:
+    commit = current_commit()
+    report = json.dumps(
+        {
+            "benchmark": benchmark,
+            "commit": commit,
+            "created_at": datetime.datetime.now(datetime.UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "reflex": version("reflex"),
+            "results": results,
+        },
+        indent=2,
+    )
+    if output == "-":
+        print(report)
+        return
+    path = Path(output) if output else RESULTS_DIR / f"{benchmark}-{commit or 'unknown'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(report + "\n")
+    print(f"Wrote {path}")
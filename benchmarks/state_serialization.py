@@ -0,0 +1,99 @@
+"""Benchmark of the persistence of the table state, lists inline against out of band.
+
+Run `python -m benchmarks.state_serialization` from the project root. Every event loads the
+pickled state, runs a handler and pickles the state again, as the Redis state manager does. The
+out of band lists are kept in the local cache backend, so the latency leaves out the round trips
+to Redis.
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+import dill
+from reflex.state import State
+
+from benchmarks.report import add_output_argument, latency_summary, write_report
+from craftai.backend.shared_cache import LocalCacheBackend
+from craftai.frontend.components.table import Item, TableState, items_source
+from craftai.frontend.state_serialization import CacheListSerializer, InlineListSerializer, ListSerializer
+
+SIZES = (100, 1_000, 10_000)
+EVENTS = 50
+
+
+def _items(count: int) -> list[Item]:
+    return [
+        Item(
+            pipeline=f"pipeline-{index:07d}",
+            workflow=f"workflow-{index % 97}",
+            status=("Completed", "Pending", "Canceled")[index % 3],
+            timestamp=f"2024-01-{index % 28 + 1:02d} 10:00:00",
+            duration=f"{index % 600}s",
+        )
+        for index in range(count)
+    ]
+
+
+def _scalar_event(state: TableState) -> None:
+    state.sort_reverse = not state.sort_reverse
+
+
+def _page_event(state: TableState) -> None:
+    state.toggle_sort()
+
+
+def _run_events(serializer: ListSerializer, event: Callable[[TableState], None], count: int) -> dict[str, Any]:
+    TableState._list_serializer = serializer
+    state = State(_reflex_internal_init=True).get_substate(TableState.get_full_name().split(".")[1:])
+    assert isinstance(state, TableState)
+    state.limit = count
+    state.load_items()
+    pickled = dill.dumps(state, byref=True)
+
+    latencies = []
+    for _ in range(EVENTS):
+        start = time.perf_counter()
+        state = dill.loads(pickled)
+        event(state)
+        pickled = dill.dumps(state, byref=True)
+        latencies.append(time.perf_counter() - start)
+    return {"state_bytes": len(pickled), **latency_summary(latencies)}
+
+
+def benchmark(sizes: tuple[int, ...] = SIZES) -> list[dict[str, Any]]:
+    results = []
+    default_serializer = TableState._list_serializer
+    try:
+        for size in sizes:
+            items_source.set_items(_items(size))
+            for serializer_name, serializer in (
+                ("inline", InlineListSerializer()),
+                ("out_of_band", CacheListSerializer(LocalCacheBackend(), ttl=3600)),
+            ):
+                for event_name, event in (("scalar", _scalar_event), ("page", _page_event)):
+                    results.append(
+                        {
+                            "rows": size,
+                            "serializer": serializer_name,
+                            "event": event_name,
+                            **_run_events(serializer, event, size),
+                        }
+                    )
+    finally:
+        TableState._list_serializer = default_serializer
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Numbers of rows in the state.")
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    write_report("state_serialization", benchmark(tuple(args.sizes)), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""Benchmark of the table states filtering, sorting and paging synthetic datasets.
+
+Run `python -m benchmarks.table_state --sizes 1000 10000` from the project root, the default
+sizes go up to a million rows. Both table states are measured: the generic one in
+`components/table.py` over the in memory source, and the connectors one over SQLite. Every
+workload event runs a handler of the state and collects its delta, as the app does. The page
+cache of the connectors is invalidated before every event, so the latencies are those of the
+data source.
+
+The search events run the query of `search_items` inline, the background task only moves the
+same query off the event loop.
+"""
+
+import argparse
+import dataclasses
+import gc
+import os
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+import dill
+import psutil
+from reflex.state import BaseState, State
+from reflex.utils import format
+
+from benchmarks.report import add_output_argument, latency_summary, write_report
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+# Events per workload
+EVENTS = 20
+
+# Terms matching a single row, a range of rows, every row and no row
+SEARCH_TERMS = ("0000042", "-00001", "e-0", "no such row")
+
+
+def _rss_mb() -> float:
+    return psutil.Process().memory_info().rss / 2**20
+
+
+def _items(count: int) -> Iterator[Any]:
+    from craftai.frontend.components.table import Item
+
+    for index in range(count):
+        yield Item(
+            pipeline=f"pipeline-{index:07d}",
+            workflow=f"workflow-{index % 97}",
+            status=("Completed", "Pending", "Canceled")[index % 3],
+            timestamp=f"2024-01-{index % 28 + 1:02d} 10:{index % 60:02d}:00",
+            duration=f"{index % 600}s",
+        )
+
+
+def _connectors(count: int) -> Iterator[Any]:
+    from craftai.entities.connector import Connector
+
+    for index in range(count):
+        yield Connector(
+            name=f"connector-{index:07d}",
+            connector_type=("chromadb", "chromadb-replica")[index % 2],
+            connector_data={"host": f"chroma-{index % 16}.internal", "port": 8000},
+        )
+
+
+def _search(term_index: int) -> Callable[[Any], None]:
+    def _event(state: Any) -> None:
+        state.set_search_value(SEARCH_TERMS[term_index % len(SEARCH_TERMS)])
+        state.load_items()
+
+    return _event
+
+
+def _sort(attributes: list[str]) -> Callable[[int], Callable[[Any], None]]:
+    def _events(index: int) -> Callable[[Any], None]:
+        return lambda state: state.set_sort_value(attributes[index % len(attributes)])
+
+    return _events
+
+
+def _page(index: int) -> Callable[[Any], None]:
+    # Forward through the first pages, then a jump to the deepest offset and back
+    return lambda state: (state.next_page, state.last_page, state.first_page)[index % 3]()
+
+
+@dataclasses.dataclass
+class _Target:
+    """A table state with the loader of its dataset."""
+
+    name: str
+    state_cls: type[BaseState]
+    load: Callable[[int], None]
+    before_event: Callable[[], None]
+
+
+def _targets() -> list[_Target]:
+    from craftai.backend.connectors.store import connectors_source as source
+    from craftai.frontend.components.table import TableState, items_source
+    from craftai.frontend.pages.connectors import list as connectors_list
+
+    return [
+        _Target("items", TableState, lambda count: items_source.set_items(_items(count)), lambda: None),
+        _Target(
+            "connectors",
+            connectors_list.TableState,
+            lambda count: source.set_items(_connectors(count)),
+            lambda: source.cache.invalidate(source.namespace),
+        ),
+    ]
+
+
+def _workloads(state_cls: type[BaseState]) -> dict[str, Callable[[int], Callable[[Any], None]]]:
+    from craftai.entities.connector import Connector
+    from craftai.frontend.components.table import Item, TableState
+
+    attributes = (Item if issubclass(state_cls, TableState) else Connector).sort_attributes()
+    return {
+        "search": _search,
+        "sort": _sort(attributes),
+        "toggle": lambda _: lambda state: state.toggle_sort(),
+        "page": _page,
+    }
+
+
+def _run_workload(target: _Target, events: Callable[[int], Callable[[Any], None]]) -> dict[str, Any]:
+    root = State(_reflex_internal_init=True)
+    state: Any = root.get_substate(target.state_cls.get_full_name().split(".")[1:])
+    state.load_items()
+    root.get_delta()
+    root._clean()
+
+    latencies = []
+    delta_bytes = []
+    for index in range(EVENTS):
+        target.before_event()
+        start = time.perf_counter()
+        events(index)(state)
+        delta = root.get_delta()
+        latencies.append(time.perf_counter() - start)
+        root._clean()
+        delta_bytes.append(len(format.json_dumps(delta).encode()))
+    return {
+        **latency_summary(latencies),
+        "mean_delta_bytes": sum(delta_bytes) / len(delta_bytes),
+        "max_delta_bytes": max(delta_bytes),
+        # Size of the state as the Redis state manager persists it
+        "state_bytes": len(dill.dumps(state, byref=True)),
+    }
+
+
+def benchmark(sizes: tuple[int, ...] = SIZES, targets: tuple[str, ...] = ()) -> list[dict[str, Any]]:
+    results = []
+    for target in _targets():
+        if targets and target.name not in targets:
+            continue
+        for size in sizes:
+            gc.collect()
+            rss = _rss_mb()
+            start = time.perf_counter()
+            target.load(size)
+            load_seconds = time.perf_counter() - start
+            dataset_mb = _rss_mb() - rss
+            for workload, events in _workloads(target.state_cls).items():
+                results.append(
+                    {
+                        "state": target.name,
+                        "rows": size,
+                        "workload": workload,
+                        "load_seconds": load_seconds,
+                        "dataset_rss_mb": dataset_mb,
+                        **_run_workload(target, events),
+                    }
+                )
+            print(f"{target.name}: {size} rows done")
+        target.load(0)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES), help="Numbers of rows of the datasets.")
+    parser.add_argument(
+        "--states", nargs="+", default=[], choices=["items", "connectors"], help="States to measure, all by default."
+    )
+    add_output_argument(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        # The connectors are stored in a scratch database, never in the one of the app
+        from craftai.backend.data_source.sqlite import DB_PATH_ENV
+
+        os.environ[DB_PATH_ENV] = os.path.join(directory, "benchmark.db")
+        results = benchmark(tuple(args.sizes), tuple(args.states))
+    write_report("table_state", results, args.output)
+
+
+if __name__ == "__main__":
+    main()
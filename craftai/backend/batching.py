@@ -0,0 +1,76 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Generic, TypeVar
+
+RequestT = TypeVar("RequestT")
+ResultT = TypeVar("ResultT")
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_DELAY = 0.005
+
+
+class Batcher(Generic[RequestT, ResultT]):
+    """Groups single requests arriving within a short window into one batch call.
+
+    The first pending request starts a `max_delay` window, the batch is sent when the window
+    closes or as soon as `max_batch_size` requests are pending. The handler returns one result
+    per request, in order, and every caller receives its own result. A handler may return an
+    exception as the result of a request to fail only its caller, an exception it raises fails
+    the whole batch.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[RequestT]], Awaitable[Sequence[ResultT | BaseException]]],
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_delay: float = DEFAULT_MAX_DELAY,
+    ):
+        self._handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending: list[tuple[RequestT, asyncio.Future[ResultT]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    async def submit(self, request: RequestT) -> ResultT:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[ResultT] = loop.create_future()
+        self._pending.append((request, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[: self.max_batch_size]
+            del self._pending[: self.max_batch_size]
+            task = asyncio.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: list[tuple[RequestT, asyncio.Future[ResultT]]]) -> None:
+        try:
+            results = await self._handler([request for request, _ in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch handler returned {len(results)} results for {len(batch)} requests")
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
@@ -0,0 +1,231 @@
+"""Bulk import and export of connectors as JSON Lines or CSV.
+
+Files are streamed, only one batch of connectors is held in memory. Every record is validated
+against the config class of its connector type, invalid records are reported by line and
+skipped. Run `python -m craftai.backend.connectors.bulk import connectors.jsonl` or
+`python -m craftai.backend.connectors.bulk export connectors.csv` from the project root.
+
+In CSV files `connector_data` is a column holding the config as a JSON object.
+
+A running app picks up the imported connectors on its next read of the connectors, at the latest
+with the next health poll: it notices the commits of the import to the database and drops the
+pages it cached.
+"""
+
+import argparse
+import csv
+import dataclasses
+import json
+import sys
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+import pydantic.v1 as pydantic
+
+from craftai.backend.connectors.load import ConnectorRegistry, connector_registry
+from craftai.backend.data_source.cached import CachedDataSource
+from craftai.backend.data_source.sqlite import SqliteDataSource
+from craftai.entities.connector import Connector
+
+FORMATS = ("jsonl", "csv")
+# Fields of a record, also the columns of CSV files
+CSV_FIELDS = ("name", "connector_type", "connector_data")
+
+DEFAULT_BATCH_SIZE = 1000
+# Errors kept in a report, further errors are only counted
+MAX_REPORTED_ERRORS = 1000
+
+ConnectorStore = CachedDataSource[Connector] | SqliteDataSource[Connector]
+
+
+@dataclasses.dataclass
+class RecordError:
+    line: int
+    message: str
+
+
+@dataclasses.dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: list[RecordError] = dataclasses.field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RecordError(line, message))
+
+
+def format_of(path: Path) -> str:
+    """Format of a file from its suffix, `.ndjson` and `.json` are read as JSON Lines."""
+    suffix = path.suffix.lower().lstrip(".")
+    if suffix == "csv":
+        return "csv"
+    if suffix in ("jsonl", "ndjson", "json"):
+        return "jsonl"
+    raise ValueError(f"Unknown format of {path}, expected one of {', '.join(FORMATS)}")
+
+
+def _read_jsonl(file: IO[str]) -> Iterator[tuple[int, Any]]:
+    for line_number, line in enumerate(file, start=1):
+        if line.strip():
+            try:
+                yield line_number, json.loads(line)
+            except json.JSONDecodeError as error:
+                yield line_number, ValueError(f"Invalid JSON: {error.msg} at column {error.colno}")
+
+
+def _read_csv(file: IO[str]) -> Iterator[tuple[int, Any]]:
+    reader = csv.DictReader(file)
+    missing = set(CSV_FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        yield 1, ValueError(f"Missing columns: {', '.join(sorted(missing))}")
+        return
+    # The line of a record is the line it starts on, quoted values may span lines
+    line_number = reader.line_num + 1
+    for row in reader:
+        try:
+            record: Any = {**row, "connector_data": json.loads(row["connector_data"] or "{}")}
+        except json.JSONDecodeError as error:
+            record = ValueError(f"Invalid JSON in connector_data: {error.msg}")
+        yield line_number, record
+        line_number = reader.line_num + 1
+
+
+def read_records(file: IO[str], file_format: str) -> Iterator[tuple[int, Any]]:
+    """Records of the file with their line numbers, records which cannot be parsed are exceptions."""
+    if file_format == "csv":
+        return _read_csv(file)
+    if file_format == "jsonl":
+        return _read_jsonl(file)
+    raise ValueError(f"Unknown format {file_format}, expected one of {', '.join(FORMATS)}")
+
+
+def _error_message(error: Exception) -> str:
+    if isinstance(error, pydantic.ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" for detail in error.errors()
+        )
+    if isinstance(error, KeyError):
+        return str(error.args[0])
+    return str(error)
+
+
+def validate_record(record: Any, registry: ConnectorRegistry = connector_registry) -> Connector:
+    """Connector of the record, with its config validated against the config class of its type.
+
+    The config is stored as validated, values are converted to the types of the config fields
+    and defaults which were not set are left out.
+    """
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Expected an object with name, connector_type and connector_data")
+    name, connector_type, connector_data = (record.get(field) for field in CSV_FIELDS)
+    if not isinstance(name, str) or not name:
+        raise ValueError("name: must be a non-empty string")
+    if not isinstance(connector_type, str):
+        raise ValueError("connector_type: must be a string")
+    if not isinstance(connector_data, dict):
+        raise ValueError("connector_data: must be an object")
+    config = registry.get_class(connector_type).config_class.parse_obj(connector_data)
+    # The fields are checked above, validating the connector model again would double the cost
+    return Connector.construct(
+        name=name,
+        connector_type=connector_type,
+        connector_data=config.dict(exclude_unset=True),
+    )
+
+
+def import_connectors(
+    records: Iterable[tuple[int, Any]],
+    store: ConnectorStore,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    registry: ConnectorRegistry = connector_registry,
+    dry_run: bool = False,
+) -> ImportReport:
+    """Validate the records and save the valid ones in batches of `batch_size`.
+
+    Connectors are upserted by name, a record of an existing connector replaces it. Every batch is
+    committed on its own, an interrupted import keeps the batches saved so far.
+    """
+    report = ImportReport()
+    batch: list[Connector] = []
+
+    def _commit() -> None:
+        if not dry_run:
+            store.upsert_many(batch)
+        report.imported += len(batch)
+        batch.clear()
+
+    for line, record in records:
+        try:
+            batch.append(validate_record(record, registry))
+        except (ValueError, KeyError, pydantic.ValidationError) as error:
+            report.add_error(line, _error_message(error))
+            continue
+        if len(batch) >= batch_size:
+            _commit()
+    if batch:
+        _commit()
+    return report
+
+
+def export_connectors(connectors: Iterable[Connector], file: IO[str], file_format: str) -> int:
+    """Write the connectors to the file, returns the number of written connectors."""
+    count = 0
+    if file_format == "csv":
+        writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+        for connector in connectors:
+            writer.writerow({**connector.dict(), "connector_data": json.dumps(connector.connector_data)})
+            count += 1
+    elif file_format == "jsonl":
+        for connector in connectors:
+            file.write(json.dumps(connector.dict()) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Unknown format {file_format}, expected one of {', '.join(FORMATS)}")
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["import", "export"])
+    parser.add_argument("path", type=Path, help="File to import or export to, `-` for stdin or stdout.")
+    parser.add_argument("--format", choices=FORMATS, help="Format of the file, by default from its suffix.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Connectors saved per commit.")
+    parser.add_argument("--dry-run", action="store_true", help="Validate the records without saving them.")
+    args = parser.parse_args()
+
+    to_stdio = str(args.path) == "-"
+    file_format = args.format or ("jsonl" if to_stdio else format_of(args.path))
+
+    # The store of the app, running apps notice the import in the database and reload their pages
+    from craftai.backend.connectors.store import connectors_source
+
+    if args.command == "export":
+        with (
+            open(sys.stdout.fileno(), "w", newline="", closefd=False) if to_stdio else args.path.open("w", newline="")
+        ) as file:
+            count = export_connectors(connectors_source.iter_items(), file, file_format)
+        print(f"Exported {count} connectors", file=sys.stderr)
+        return
+
+    with sys.stdin if to_stdio else args.path.open(newline="") as file:
+        report = import_connectors(
+            read_records(file, file_format), connectors_source, args.batch_size, dry_run=args.dry_run
+        )
+    for error in report.errors:
+        print(f"{args.path}:{error.line}: {error.message}", file=sys.stderr)
+    if report.failed > len(report.errors):
+        print(f"... {report.failed - len(report.errors)} more errors", file=sys.stderr)
+    action = "Validated" if args.dry_run else "Imported"
+    print(f"{action} {report.imported} connectors, {report.failed} records failed", file=sys.stderr)
+    if report.failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import asyncio
+from collections.abc import Sequence
+
+from craftai.backend.connectors.load import ConnectorRegistry, connector_registry
+from craftai.entities.connector import Connector
+
+# Connector statuses, named after the states of the `status_badge` component
+STATUS_HEALTHY = "Completed"
+STATUS_UNKNOWN = "Pending"
+STATUS_FAILED = "Canceled"
+
+DEFAULT_TIMEOUT = 5.0
+
+
+async def check_connector(
+    connector: Connector,
+    timeout: float = DEFAULT_TIMEOUT,
+    registry: ConnectorRegistry = connector_registry,
+) -> str:
+    """Status of a single connector, a check which did not finish in time leaves it unknown."""
+    try:
+        healthy = await asyncio.wait_for(registry.load(connector).ahealth_check(), timeout)
+    except TimeoutError:
+        return STATUS_UNKNOWN
+    except Exception:
+        return STATUS_FAILED
+    return STATUS_HEALTHY if healthy else STATUS_FAILED
+
+
+async def check_connectors(
+    connectors: Sequence[Connector],
+    timeout: float = DEFAULT_TIMEOUT,
+    registry: ConnectorRegistry = connector_registry,
+) -> dict[str, str]:
+    """Check all connectors concurrently, statuses are keyed by connector id."""
+    statuses = await asyncio.gather(*(check_connector(connector, timeout, registry) for connector in connectors))
+    return {connector.list_id(): status for connector, status in zip(connectors, statuses)}
@@ -0,0 +1,92 @@
+import importlib
+import json
+import threading
+from typing import Any
+
+from craftai.backend.connectors.types.base import BaseConnectorType
+from craftai.entities.connector import Connector
+
+# Connector type implementations as "module:class" paths. Modules are imported on first use,
+# so the client library of a connector type is only loaded when such a connector exists.
+CONNECTOR_TYPES: dict[str, str] = {
+    "chromadb": "craftai.backend.connectors.types.chromadb:ChromaDbConnectorType",
+}
+
+
+def config_key(config: dict[str, Any]) -> str:
+    """Stable representation of a connector config, equal configs give equal keys."""
+    return json.dumps(config, sort_keys=True, default=str)
+
+
+class ConnectorRegistry:
+    """Maps connector types to their implementations and pools connector instances.
+
+    One instance, and therefore one client, is kept per `(connector_type, config)` pair and
+    shared by every caller loading a connector with the same configuration. The connectors the
+    instances were loaded for are kept, so stale instances can be found after external writes.
+    """
+
+    def __init__(self, connector_types: dict[str, str] | None = None):
+        self._paths = dict(CONNECTOR_TYPES if connector_types is None else connector_types)
+        self._classes: dict[str, type[BaseConnectorType]] = {}
+        self._pool: dict[tuple[str, str], BaseConnectorType] = {}
+        self._loaded: dict[str, Connector] = {}
+        self._lock = threading.Lock()
+
+    def register(self, connector_type: str, path: str) -> None:
+        with self._lock:
+            self._paths[connector_type] = path
+            self._classes.pop(connector_type, None)
+
+    def connector_types(self) -> list[str]:
+        return sorted(self._paths)
+
+    def get_class(self, connector_type: str) -> type[BaseConnectorType]:
+        with self._lock:
+            return self._get_class(connector_type)
+
+    def _get_class(self, connector_type: str) -> type[BaseConnectorType]:
+        cls = self._classes.get(connector_type)
+        if cls is None:
+            if connector_type not in self._paths:
+                raise KeyError(f"Unknown connector type: {connector_type}")
+            module_name, class_name = self._paths[connector_type].split(":")
+            cls = getattr(importlib.import_module(module_name), class_name)
+            self._classes[connector_type] = cls
+        return cls
+
+    def load(self, connector: Connector) -> BaseConnectorType:
+        """Pooled connector instance for the type and config of the connector."""
+        key = (connector.connector_type, config_key(connector.connector_data))
+        with self._lock:
+            instance = self._pool.get(key)
+            if instance is None:
+                instance = self._get_class(connector.connector_type)(connector.connector_data)
+                self._pool[key] = instance
+            self._loaded[connector.list_id()] = connector
+            return instance
+
+    def loaded(self) -> list[Connector]:
+        """The connectors pooled instances were loaded for, as they were loaded."""
+        with self._lock:
+            return list(self._loaded.values())
+
+    def release(self, connector: Connector) -> None:
+        """Close and drop the pooled instance, e.g. when the connector was edited or deleted."""
+        key = (connector.connector_type, config_key(connector.connector_data))
+        with self._lock:
+            instance = self._pool.pop(key, None)
+            self._loaded.pop(connector.list_id(), None)
+        if instance is not None:
+            instance.close()
+
+    def close(self) -> None:
+        with self._lock:
+            instances = list(self._pool.values())
+            self._pool.clear()
+            self._loaded.clear()
+        for instance in instances:
+            instance.close()
+
+
+connector_registry = ConnectorRegistry()
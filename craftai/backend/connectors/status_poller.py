@@ -0,0 +1,131 @@
+import asyncio
+import random
+import time
+from collections.abc import Callable, Iterable
+
+from reflex.utils import console
+
+from craftai.backend.connectors.health import DEFAULT_TIMEOUT, STATUS_HEALTHY, check_connector
+from craftai.backend.connectors.load import ConnectorRegistry, connector_registry
+from craftai.backend.data_source.changes import ChangeFeed
+from craftai.entities.connector import Connector
+
+DEFAULT_INTERVAL = 30.0
+DEFAULT_JITTER = 0.1
+DEFAULT_MAX_BACKOFF = 300.0
+DEFAULT_CONCURRENCY = 8
+# Shortest pause between two polls, checks falling due meanwhile wait for the next poll
+DEFAULT_MIN_WAIT = 1.0
+
+
+class StatusPoller:
+    """Polls the health of the connectors on a schedule shared by all sessions.
+
+    Every connector is checked each `interval` seconds, spread by a random `jitter` fraction so
+    the checks do not run in lockstep. A connector which is not healthy is checked with an
+    exponential backoff up to `max_backoff` seconds. At most `concurrency` checks run at the
+    same time. Changed statuses are published to `changes`.
+
+    The connectors are listed off the event loop, at most once per interval, so new and deleted
+    connectors are picked up within an interval.
+    """
+
+    def __init__(
+        self,
+        connectors: Callable[[], Iterable[Connector]],
+        interval: float = DEFAULT_INTERVAL,
+        jitter: float = DEFAULT_JITTER,
+        max_backoff: float = DEFAULT_MAX_BACKOFF,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        timeout: float = DEFAULT_TIMEOUT,
+        min_wait: float = DEFAULT_MIN_WAIT,
+        registry: ConnectorRegistry = connector_registry,
+        clock: Callable[[], float] = time.monotonic,
+        rng: random.Random | None = None,
+    ):
+        self.interval = interval
+        self.jitter = jitter
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.min_wait = min_wait
+        self._connectors = connectors
+        self._listed: dict[str, Connector] = {}
+        self._listed_at: float | None = None
+        self._concurrency = concurrency
+        self._registry = registry
+        self._clock = clock
+        self._rng = rng or random.Random()
+        self._next_check: dict[str, float] = {}
+        self._failures: dict[str, int] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.statuses: dict[str, str] = {}
+        self.changes: ChangeFeed[dict[str, str]] = ChangeFeed()
+
+    def _delay(self, item_id: str) -> float:
+        delay = min(self.interval * 2 ** self._failures.get(item_id, 0), self.max_backoff)
+        return delay * self._rng.uniform(1 - self.jitter, 1 + self.jitter)
+
+    async def _check(self, connector: Connector, semaphore: asyncio.Semaphore) -> str:
+        async with semaphore:
+            return await check_connector(connector, self.timeout, self._registry)
+
+    async def _list(self, now: float) -> dict[str, Connector]:
+        if self._listed_at is None or now - self._listed_at >= self.interval:
+            # Listing reads the whole store, it would block the event loop
+            self._listed = await asyncio.to_thread(
+                lambda: {connector.list_id(): connector for connector in self._connectors()}
+            )
+            self._listed_at = now
+        return self._listed
+
+    async def poll(self) -> dict[str, str]:
+        """Check the connectors which are due and return the statuses which changed."""
+        now = self._clock()
+        connectors = await self._list(now)
+        for removed in self._next_check.keys() - connectors.keys():
+            self._next_check.pop(removed)
+            self._failures.pop(removed, None)
+            self.statuses.pop(removed, None)
+
+        due = [connector for item_id, connector in connectors.items() if self._next_check.get(item_id, now) <= now]
+        semaphore = asyncio.Semaphore(self._concurrency)
+        statuses = await asyncio.gather(*(self._check(connector, semaphore) for connector in due))
+
+        changed = {}
+        now = self._clock()
+        for connector, status in zip(due, statuses):
+            item_id = connector.list_id()
+            if status == STATUS_HEALTHY:
+                self._failures.pop(item_id, None)
+            else:
+                self._failures[item_id] = self._failures.get(item_id, 0) + 1
+            self._next_check[item_id] = now + self._delay(item_id)
+            if self.statuses.get(item_id) != status:
+                self.statuses[item_id] = status
+                changed[item_id] = status
+        if changed:
+            self.changes.publish(changed)
+        return changed
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                # The poller is shared by all sessions, a failed poll is retried
+                console.error(f"Polling the connector statuses failed: {e!r}")
+            now = self._clock()
+            next_check = min(self._next_check.values(), default=now + self.interval)
+            # New connectors are picked up within an interval at the latest
+            await asyncio.sleep(max(min(next_check - now, self.interval), min(self.min_wait, self.interval)))
+
+    def start(self) -> None:
+        """Start polling in the background, does nothing when it already runs."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -0,0 +1,25 @@
+"""The connectors store shared by the app and the command line tools."""
+
+from reflex.config import get_config
+
+from craftai.backend.connectors.load import connector_registry
+from craftai.backend.connectors.status_poller import StatusPoller
+from craftai.backend.connectors.tools_cache import release_connectors
+from craftai.backend.data_source.cached import CachedDataSource
+from craftai.backend.data_source.sqlite import SqliteDataSource, db_path
+from craftai.backend.shared_cache import SharedCache, cache_backend
+from craftai.entities.connector import Connector
+
+# Pages are cached for all sessions, in Redis when the app is configured with one.
+shared_cache = SharedCache(cache_backend(get_config().redis_url))
+# Writes release the pooled instances and cached tools of the connectors they change, external
+# writes release those of the pooled connectors which changed.
+connectors_source: CachedDataSource[Connector] = CachedDataSource(
+    SqliteDataSource(Connector, db_path()),
+    shared_cache,
+    on_replaced=release_connectors,
+    derived_from=connector_registry.loaded,
+)
+
+# Health of the connectors is polled once for all sessions
+status_poller = StatusPoller(connectors_source.iter_items)
@@ -0,0 +1,120 @@
+import asyncio
+import dataclasses
+import hashlib
+import time
+from collections.abc import Callable
+
+from craftai.backend.connectors.load import ConnectorRegistry, config_key, connector_registry
+from craftai.entities.connector import Connector
+from craftai.entities.tool import Tool
+
+DEFAULT_TTL = 300.0
+
+
+def connector_hash(connector: Connector) -> str:
+    """Hash of the connector type and config, connectors configured the same way share it."""
+    value = f"{connector.connector_type}:{config_key(connector.connector_data)}"
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+@dataclasses.dataclass
+class _Entry:
+    tools: list[Tool]
+    fetched_at: float
+
+
+class ToolsCache:
+    """Cache of the tools discovered on connectors.
+
+    Entries are keyed by the connector config hash and expire after `ttl` seconds. An expired
+    entry is still returned while a single background task fetches the fresh list, so callers
+    only wait for a connector the first time its tools are requested. Invalidating a key does not
+    cancel its running fetch, other callers may be waiting for it, the fetched list is dropped
+    instead of cached.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        registry: ConnectorRegistry = connector_registry,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl = ttl
+        self._registry = registry
+        self._clock = clock
+        self._entries: dict[str, _Entry] = {}
+        self._refreshing: dict[str, asyncio.Task[list[Tool]]] = {}
+        # Bumped on invalidation, a fetch started before is not cached
+        self._generations: dict[str, int] = {}
+
+    async def get_tools(self, connector: Connector, wait: bool = True) -> list[Tool]:
+        """Tools of the connector.
+
+        Args:
+            connector: The connector to discover the tools of.
+            wait: Whether to wait for the discovery when nothing is cached yet, otherwise an
+                empty list is returned and the discovery continues in the background.
+
+        Returns:
+            The cached tools, possibly stale.
+        """
+        key = connector_hash(connector)
+        entry = self._entries.get(key)
+        if entry is None:
+            task = self._refresh(key, connector)
+            return await asyncio.shield(task) if wait else []
+
+        if self._clock() - entry.fetched_at >= self.ttl:
+            self._refresh(key, connector)
+        return entry.tools
+
+    def invalidate(self, connector: Connector) -> None:
+        """Drop the cached tools, e.g. after the connector was edited."""
+        self._forget(connector_hash(connector))
+
+    def clear(self) -> None:
+        for key in list(self._refreshing):
+            self._forget(key)
+        self._entries.clear()
+
+    def _forget(self, key: str) -> None:
+        self._entries.pop(key, None)
+        # The next request starts a new fetch, the running one finishes for its waiting callers
+        if self._refreshing.pop(key, None) is not None:
+            self._generations[key] = self._generations.get(key, 0) + 1
+
+    def _refresh(self, key: str, connector: Connector) -> asyncio.Task[list[Tool]]:
+        # Concurrent requests for the same connector share one discovery
+        task = self._refreshing.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch(key, connector, self._generations.get(key, 0)))
+            self._refreshing[key] = task
+            task.add_done_callback(lambda done: self._done(key, done))
+        return task
+
+    async def _fetch(self, key: str, connector: Connector, generation: int) -> list[Tool]:
+        tools = await self._registry.load(connector).aget_tools()
+        if self._generations.get(key, 0) == generation:
+            self._entries[key] = _Entry(tools=tools, fetched_at=self._clock())
+        return tools
+
+    def _done(self, key: str, task: asyncio.Task[list[Tool]]) -> None:
+        if self._refreshing.get(key) is task:
+            del self._refreshing[key]
+        if not task.cancelled():
+            # A failed refresh keeps the stale entry, waiting callers get the exception
+            task.exception()
+
+
+tools_cache = ToolsCache()
+
+
+def release_connectors(connectors: list[Connector] | None) -> None:
+    """Drop the pooled instances and cached tools of edited or deleted connectors, of all for None."""
+    if connectors is None:
+        connector_registry.close()
+        tools_cache.clear()
+        return
+    for connector in connectors:
+        connector_registry.release(connector)
+        tools_cache.invalidate(connector)
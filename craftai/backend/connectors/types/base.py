@@ -1,11 +1,61 @@
 import abc
-from typing import Any
+import asyncio
+import threading
+from typing import Any, ClassVar, Generic, TypeVar
 
+from craftai.entities.config.base import BaseConfig
+from craftai.entities.tool import Tool
+
+ClientT = TypeVar("ClientT")
+
+
+class BaseConnectorType(abc.ABC, Generic[ClientT]):
+    """Access to an external resource.
+
+    Implementations provide the blocking API. The async variants run it in a worker thread, so
+    event handlers awaiting them do not stall the event loop; implementations with a native async
+    client can override them.
+    """
+
+    # Config model the raw connector data is validated against
+    config_class: ClassVar[type[BaseConfig]]
 
-class BaseConnectorType(abc.ABC):
     def __init__(self, config: dict[str, Any]):
         self.raw_config = config
+        self._client: ClientT | None = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> ClientT:
+        """Client of the external resource, created on first use and reused afterwards."""
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self.create_client()
+        return self._client
 
     @abc.abstractmethod
-    def get_tools(self) -> None:
+    def create_client(self) -> ClientT:
         pass
+
+    def close(self) -> None:
+        """Release the client, the next use creates a new one."""
+        with self._client_lock:
+            self._client = None
+
+    @abc.abstractmethod
+    def get_tools(self) -> list[Tool]:
+        pass
+
+    @abc.abstractmethod
+    def health_check(self) -> bool:
+        """Whether the external resource is reachable, may raise on connection errors."""
+
+    async def aget_tools(self) -> list[Tool]:
+        return await asyncio.to_thread(self.get_tools)
+
+    async def ahealth_check(self) -> bool:
+        return await asyncio.to_thread(self.health_check)
+
+    async def aclose(self) -> None:
+        await asyncio.to_thread(self.close)
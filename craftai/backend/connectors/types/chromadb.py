@@ -1,10 +1,273 @@
+import asyncio
+import dataclasses
+import functools
+import hashlib
+import json
+import threading
 from typing import Any
 
+import chromadb
+import numpy as np
+import numpy.typing as npt
+from chromadb.api import ClientAPI
+from chromadb.api.models.Collection import Collection
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+
+from craftai.backend.batching import Batcher
+from craftai.backend.connectors.load import config_key
 from craftai.backend.connectors.types.base import BaseConnectorType
-from craftai.entities.config.chromadb import ChromaDbConfig
+from craftai.backend.embedding_cache import EmbeddingCache
+from craftai.backend.result_cache import ResultCache
+from craftai.entities.config.chromadb import EMBEDDING_FUNCTIONS, ChromaDbConfig
+from craftai.entities.tool import Tool
+
+
+@dataclasses.dataclass
+class QueryResult:
+    """Matches of a single query text, ordered by distance."""
+
+    ids: list[str]
+    documents: list[str | None]
+    metadatas: list[dict[str, Any] | None]
+    distances: list[float]
+
+
+def _result_size(result: QueryResult) -> int:
+    return len(json.dumps(dataclasses.asdict(result), default=str))
+
+
+def _create_embedding_function(name: str, args: dict[str, Any]) -> EmbeddingFunction[Documents]:
+    try:
+        return getattr(embedding_functions, EMBEDDING_FUNCTIONS[name])(**args)
+    except (ImportError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Cannot create the embedding function {name!r}: {e}") from e
+
+
+def _model_id(name: str, args: dict[str, Any]) -> str:
+    # The arguments select the model and may hold credentials, only their hash is kept
+    return f"{name}-{hashlib.sha256(config_key(args).encode()).hexdigest()[:16]}" if args else name
+
+
+class CachedEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Embedding function of the collections, it embeds through the cache of the connector."""
+
+    def __init__(self, embedding_cache: EmbeddingCache):
+        self.embedding_cache = embedding_cache
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return list(np.asarray(self.embedding_cache.embed(input), dtype=np.float32))
+
+
+@dataclasses.dataclass(frozen=True)
+class QueryRequest:
+    text: str
+    n_results: int
+    # Serialized `where`, queries with equal parameters share a `collection.query` call
+    where_key: str
+    where: dict[str, Any] | None = None
+
+
+@dataclasses.dataclass(frozen=True)
+class UpsertRequest:
+    document_id: str
+    document: str
+    metadata: dict[str, Any] | None = None
+
+
+class ChromaDbConnectorType(BaseConnectorType[ClientAPI]):
+    """ChromaDB connector.
 
+    Single-document queries and upserts are batched per collection: concurrent calls are
+    collected for `batch_delay` seconds, then queries with the same parameters are sent as one
+    `collection.query` call and upserts as one `collection.upsert` call.
+
+    Texts are embedded by the app with the embedding function named in the config, through an
+    `EmbeddingCache`, so repeated texts are not embedded again. The collections get the same
+    cached function, the thin client cannot embed texts on its own. Queries and upserts fail
+    without an embedding function, health checks and tool discovery do not need one.
+
+    Query results are cached per collection and dropped when the collection is written through
+    this connector.
+    """
+
+    config_class = ChromaDbConfig
 
-class ChromaDbConnectorType(BaseConnectorType):
     def __init__(self, config: dict[str, Any]):
         super().__init__(config)
-        self.config = ChromaDbConfig.from_dict(config)
+        self.config = ChromaDbConfig.parse_obj(config)
+        self._collections: dict[str, Collection] = {}
+        self._collections_lock = threading.Lock()
+        self._query_batchers: dict[str, Batcher[QueryRequest, QueryResult]] = {}
+        self._upsert_batchers: dict[tuple[str, bool], Batcher[UpsertRequest, None]] = {}
+        self.result_cache: ResultCache[QueryResult] = ResultCache(_result_size, self.config.result_cache_bytes)
+
+    def create_client(self) -> ClientAPI:
+        return chromadb.HttpClient(host=self.config.host, port=self.config.port)
+
+    def close(self) -> None:
+        with self._collections_lock:
+            self._collections.clear()
+        super().close()
+
+    def get_tools(self) -> list[Tool]:
+        return [
+            Tool(
+                name=collection.name,
+                description=(collection.metadata or {}).get("description", f"Search the {collection.name} collection"),
+            )
+            for collection in self.client.list_collections()
+        ]
+
+    def health_check(self) -> bool:
+        self.client.heartbeat()
+        return True
+
+    def _require_embedding_function(self) -> str:
+        if self.config.embedding_function is None:
+            raise ValueError("The connector has no embedding_function, it is required to query and upsert texts")
+        return self.config.embedding_function
+
+    @functools.cached_property
+    def embedding_cache(self) -> EmbeddingCache:
+        """Cache in front of the embedding function of the config, created on first use."""
+        name = self._require_embedding_function()
+        args = self.config.embedding_function_args
+        return EmbeddingCache(
+            _create_embedding_function(name, args),
+            _model_id(name, args),
+            max_entries=self.config.embedding_cache_size,
+            directory=self.config.embedding_cache_dir,
+        )
+
+    @functools.cached_property
+    def embedding_function(self) -> CachedEmbeddingFunction:
+        return CachedEmbeddingFunction(self.embedding_cache)
+
+    async def _embed(self, texts: list[str]) -> npt.NDArray[np.float32]:
+        return np.asarray(await asyncio.to_thread(self.embedding_cache.embed, texts), dtype=np.float32)
+
+    def collection(self, name: str) -> Collection:
+        """Collection handle, fetched once per collection name."""
+        collection = self._collections.get(name)
+        if collection is None:
+            with self._collections_lock:
+                collection = self._collections.get(name)
+                if collection is None:
+                    # Collections of texts only, the function is typed for images as well
+                    collection = self.client.get_collection(
+                        name,
+                        embedding_function=self.embedding_function,  # type: ignore[arg-type]
+                    )
+                    self._collections[name] = collection
+        return collection
+
+    async def query(
+        self,
+        collection: str,
+        text: str,
+        n_results: int = 10,
+        where: dict[str, Any] | None = None,
+    ) -> QueryResult:
+        self._require_embedding_function()
+        where_key = json.dumps(where, sort_keys=True)
+        version = self.result_cache.version(collection)
+        cached = self.result_cache.get(collection, (text, n_results, where_key))
+        if cached is not None:
+            return cached
+
+        batcher = self._query_batchers.get(collection)
+        if batcher is None:
+            batcher = Batcher(
+                functools.partial(self._query_batch, collection),
+                max_batch_size=self.config.batch_size,
+                max_delay=self.config.batch_delay,
+            )
+            self._query_batchers[collection] = batcher
+        result = await batcher.submit(QueryRequest(text=text, n_results=n_results, where_key=where_key, where=where))
+        self.result_cache.put(collection, (text, n_results, where_key), result, version)
+        return result
+
+    async def upsert(
+        self,
+        collection: str,
+        document_id: str,
+        document: str,
+        metadata: dict[str, Any] | None = None,
+    ) -> None:
+        self._require_embedding_function()
+        # Chroma expects metadatas either for all documents of a call or for none
+        key = (collection, metadata is not None)
+        batcher = self._upsert_batchers.get(key)
+        if batcher is None:
+            batcher = Batcher(
+                functools.partial(self._upsert_batch, collection),
+                max_batch_size=self.config.batch_size,
+                max_delay=self.config.batch_delay,
+            )
+            self._upsert_batchers[key] = batcher
+        await batcher.submit(UpsertRequest(document_id=document_id, document=document, metadata=metadata))
+
+    def _query_collection(
+        self, collection: str, n_results: int, where: dict[str, Any] | None, embeddings: npt.NDArray[np.float32]
+    ) -> Any:
+        # Fetching the collection handle is a network call on first use, it runs in the thread too
+        return self.collection(collection).query(query_embeddings=embeddings, n_results=n_results, where=where)
+
+    async def _query_batch(self, collection: str, requests: list[QueryRequest]) -> list[QueryResult | BaseException]:
+        groups: dict[tuple[int, str], list[QueryRequest]] = {}
+        for request in requests:
+            groups.setdefault((request.n_results, request.where_key), []).append(request)
+        # The texts of all groups are embedded together
+        unique_texts = list(dict.fromkeys(request.text for request in requests))
+        embedding_of = dict(zip(unique_texts, await self._embed(unique_texts)))
+
+        async def _query(group: list[QueryRequest]) -> dict[str, QueryResult]:
+            texts = list(dict.fromkeys(request.text for request in group))
+            result = await asyncio.to_thread(
+                self._query_collection,
+                collection,
+                group[0].n_results,
+                group[0].where,
+                np.stack([embedding_of[text] for text in texts]),
+            )
+            results = {}
+            for i, text in enumerate(texts):
+                ids = result["ids"][i]
+                documents: list[str | None] = list(result["documents"][i]) if result["documents"] else [None] * len(ids)
+                results[text] = QueryResult(
+                    ids=ids,
+                    documents=documents,
+                    metadatas=[dict(m) for m in result["metadatas"][i]] if result["metadatas"] else [None] * len(ids),
+                    distances=result["distances"][i] if result["distances"] else [],
+                )
+            return results
+
+        # A failing group, e.g. with an invalid `where`, only fails the requests of that group
+        group_results = dict(
+            zip(
+                groups,
+                await asyncio.gather(*(_query(group) for group in groups.values()), return_exceptions=True),
+            )
+        )
+        outcomes: list[QueryResult | BaseException] = []
+        for request in requests:
+            group_result = group_results[request.n_results, request.where_key]
+            outcomes.append(group_result if isinstance(group_result, BaseException) else group_result[request.text])
+        return outcomes
+
+    async def _upsert_batch(self, collection: str, requests: list[UpsertRequest]) -> list[None]:
+        # Chroma rejects duplicate ids within a call, the latest write of a document wins
+        latest = list({request.document_id: request for request in requests}.values())
+        documents = [request.document for request in latest]
+        embeddings = await self._embed(documents)
+        await asyncio.to_thread(
+            lambda: self.collection(collection).upsert(
+                ids=[request.document_id for request in latest],
+                documents=documents,
+                embeddings=embeddings,
+                metadatas=[request.metadata for request in latest if request.metadata is not None] or None,
+            )
+        )
+        self.result_cache.invalidate(collection)
+        return [None] * len(requests)
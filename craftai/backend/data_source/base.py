@@ -0,0 +1,59 @@
+import abc
+import dataclasses
+import json
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+def encode_cursor(sort_key: str, item_id: str) -> str:
+    """Cursor pointing right after the item with the given sort key and id."""
+    return json.dumps([sort_key, item_id])
+
+
+def decode_cursor(cursor: str) -> tuple[str, str]:
+    sort_key, item_id = json.loads(cursor)
+    return sort_key, item_id
+
+
+@dataclasses.dataclass(frozen=True)
+class DataQuery:
+    """Parameters of a single page request made by a table.
+
+    A page starts either at `offset` or, when `after` is set, right after the row the cursor
+    points to. Cursors stay valid while rows are inserted or deleted before them and do not
+    require the source to skip the preceding rows.
+    """
+
+    offset: int = 0
+    limit: int = 12
+    sort_value: str = ""
+    sort_reverse: bool = False
+    search_value: str = ""
+    after: str = ""
+    # Whether the total has to be exact, otherwise a source may return a cheaper estimate
+    exact_total: bool = True
+
+
+@dataclasses.dataclass
+class DataPage(Generic[T]):
+    """A single page of rows together with the number of rows matching the query."""
+
+    items: list[T]
+    total: int
+    # Cursor of the next page, empty when there are no more rows
+    next_cursor: str = ""
+    total_exact: bool = True
+
+
+class BaseDataSource(abc.ABC, Generic[T]):
+    """Source of rows for a paginated table.
+
+    Filtering, sorting and slicing happen on the source side, so a table state only has to hold
+    the page it currently displays. Backend-backed sources (databases, remote APIs) implement
+    `query` and push the work down to the backend.
+    """
+
+    @abc.abstractmethod
+    def query(self, query: DataQuery) -> DataPage[T]:
+        pass
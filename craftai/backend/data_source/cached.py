@@ -0,0 +1,145 @@
+import dataclasses
+import json
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import Generic, TypeVar
+
+from craftai.backend.data_source.base import BaseDataSource, DataPage, DataQuery
+from craftai.backend.data_source.changes import ALL_ITEMS, ChangeFeed
+from craftai.backend.data_source.sqlite import SqliteDataSource
+from craftai.backend.shared_cache import SharedCache
+from craftai.entities.listable import Listable
+
+ListableT = TypeVar("ListableT", bound=Listable)
+
+
+class CachedDataSource(BaseDataSource[ListableT], Generic[ListableT]):
+    """Read-through shared cache in front of a persistent data source.
+
+    Pages and single items are cached under the `namespace` of the source, so sessions which
+    show the same page cost one query between them. Writes have to go through this class, they
+    invalidate the namespace. Writes of other processes to the database, such as a bulk import,
+    are noticed by the next read, which invalidates the namespace the same way. Reads of all
+    items are passed to the source.
+
+    `on_replaced` is called with the previous versions of the items a write changed or deleted,
+    with None when all items were replaced, to release what was derived from them. The previous
+    versions of external writes are unknown, `derived_from` returns the items something was
+    derived from, the ones which no longer match the database are passed to `on_replaced`.
+    Without it all items count as replaced.
+    """
+
+    def __init__(
+        self,
+        source: SqliteDataSource[ListableT],
+        cache: SharedCache,
+        namespace: str = "",
+        on_replaced: Callable[[list[ListableT] | None], None] | None = None,
+        derived_from: Callable[[], Iterable[ListableT]] | None = None,
+    ):
+        self.source = source
+        self.cache = cache
+        self.namespace = namespace or source.table
+        self.on_replaced = on_replaced
+        self.derived_from = derived_from
+        # Changes are published once the cache is invalidated, so subscribers read fresh pages
+        self.changes: ChangeFeed[str] = ChangeFeed()
+        self._data_version: int | None = None
+        self._data_version_lock = threading.Lock()
+
+    def _check_external_writes(self) -> None:
+        version = self.source.data_version()
+        with self._data_version_lock:
+            changed = self._data_version is not None and version != self._data_version
+            self._data_version = version
+        if changed:
+            self.cache.invalidate(self.namespace)
+            self._replaced(self._outdated())
+            self.changes.publish(ALL_ITEMS)
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def iter_items(self, batch_size: int = 500) -> Iterator[ListableT]:
+        self._check_external_writes()
+        return self.source.iter_items(batch_size)
+
+    @property
+    def items(self) -> list[ListableT]:
+        return self.source.items
+
+    def _load_item(self, data: dict) -> ListableT:
+        return self.source.item_class.parse_obj(data)
+
+    def query(self, query: DataQuery) -> DataPage[ListableT]:
+        def _load() -> bytes:
+            page = self.source.query(query)
+            return json.dumps({**dataclasses.asdict(page), "items": [item.dict() for item in page.items]}).encode()
+
+        self._check_external_writes()
+        key = "query:" + json.dumps(dataclasses.asdict(query), sort_keys=True)
+        data = json.loads(self.cache.get_or_load(self.namespace, key, _load))
+        return DataPage(**{**data, "items": [self._load_item(item) for item in data["items"]]})
+
+    def get(self, item_id: str) -> ListableT | None:
+        def _load() -> bytes:
+            item = self.source.get(item_id)
+            return json.dumps(None if item is None else item.dict()).encode()
+
+        self._check_external_writes()
+        data = json.loads(self.cache.get_or_load(self.namespace, f"item:{item_id}", _load))
+        return None if data is None else self._load_item(data)
+
+    def _previous(self, items: list[ListableT]) -> list[ListableT]:
+        """Stored versions of the items which differ from them, read before they are overwritten."""
+        if self.on_replaced is None:
+            return []
+        previous = self.source.get_many(item.list_id() for item in items)
+        return [
+            previous[item.list_id()]
+            for item in items
+            if item.list_id() in previous and previous[item.list_id()] != item
+        ]
+
+    def _outdated(self) -> list[ListableT] | None:
+        """Items of `derived_from` which were changed or deleted in the database, None for all."""
+        if self.on_replaced is None:
+            return []
+        if self.derived_from is None:
+            return None
+        items = list(self.derived_from())
+        stored = self.source.get_many(item.list_id() for item in items)
+        return [item for item in items if stored.get(item.list_id()) != item]
+
+    def _replaced(self, items: list[ListableT] | None) -> None:
+        if self.on_replaced is not None and (items is None or items):
+            self.on_replaced(items)
+
+    def upsert(self, item: ListableT) -> None:
+        previous = self._previous([item])
+        self.source.upsert(item)
+        self.cache.invalidate(self.namespace)
+        self._replaced(previous)
+        self.changes.publish(item.list_id())
+
+    def upsert_many(self, items: Iterable[ListableT]) -> int:
+        items = list(items)
+        previous = self._previous(items)
+        count = self.source.upsert_many(items)
+        self.cache.invalidate(self.namespace)
+        self._replaced(previous)
+        self.changes.publish(ALL_ITEMS)
+        return count
+
+    def set_items(self, items: Iterable[ListableT]) -> None:
+        self.source.set_items(items)
+        self.cache.invalidate(self.namespace)
+        self._replaced(None)
+        self.changes.publish(ALL_ITEMS)
+
+    def delete(self, item_id: str) -> None:
+        previous = list(self.source.get_many([item_id]).values()) if self.on_replaced is not None else []
+        self.source.delete(item_id)
+        self.cache.invalidate(self.namespace)
+        self._replaced(previous)
+        self.changes.publish(item_id)
@@ -0,0 +1,48 @@
+import asyncio
+import threading
+from collections.abc import AsyncIterator
+from typing import Generic, TypeVar
+
+ChangeT = TypeVar("ChangeT")
+
+# Published by data sources instead of an item id when all items were replaced
+ALL_ITEMS = ""
+
+
+class ChangeFeed(Generic[ChangeT]):
+    """Fans out changes published from any thread to subscribers on event loops.
+
+    Changes which arrive while a subscriber is busy are delivered together, so a burst of
+    writes costs a subscriber a single wake up.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue[ChangeT]]] = []
+
+    def publish(self, change: ChangeT) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, change)
+            except RuntimeError:
+                # The loop of the subscriber is closed
+                self._unsubscribe(queue)
+
+    def _unsubscribe(self, queue: asyncio.Queue[ChangeT]) -> None:
+        with self._lock:
+            self._subscribers = [(loop, other) for loop, other in self._subscribers if other is not queue]
+
+    async def subscribe(self) -> AsyncIterator[list[ChangeT]]:
+        queue: asyncio.Queue[ChangeT] = asyncio.Queue()
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        try:
+            while True:
+                changes = [await queue.get()]
+                while not queue.empty():
+                    changes.append(queue.get_nowait())
+                yield changes
+        finally:
+            self._unsubscribe(queue)
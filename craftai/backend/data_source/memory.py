@@ -0,0 +1,139 @@
+import bisect
+import itertools
+import math
+import threading
+from collections.abc import Iterable
+from typing import TypeVar
+
+from craftai.backend.data_source.base import BaseDataSource, DataPage, DataQuery, decode_cursor, encode_cursor
+from craftai.backend.data_source.changes import ALL_ITEMS, ChangeFeed
+from craftai.backend.data_source.search_index import SearchIndex
+from craftai.backend.data_source.sort_index import SortIndex, sort_key
+from craftai.entities.listable import Listable
+
+ListableT = TypeVar("ListableT", bound=Listable)
+
+
+def _position_key(position: int) -> str:
+    return f"{position:016d}"
+
+
+class InMemoryDataSource(BaseDataSource[ListableT]):
+    """Data source over items kept in the process memory.
+
+    A single instance is meant to be shared between all sessions of a table. Items are keyed by
+    `Listable.list_id` and indexed for search when they are added, so a query does not have to
+    touch every item. Sorted orders are built per column on the first query sorted by it and
+    maintained on every change afterwards. The unsorted order is the insertion order, kept in
+    the same kind of index, so cursors work the same way with and without sorting.
+
+    Only the `sort_attributes` of `item_class` can be sorted by. Ids of changed items are
+    published to `changes`, `ALL_ITEMS` when all items are replaced.
+    """
+
+    def __init__(self, item_class: type[ListableT], items: Iterable[ListableT] = ()):
+        self.item_class = item_class
+        self._sort_attributes = set(item_class.sort_attributes())
+        self._items: dict[str, ListableT] = {}
+        self._lock = threading.RLock()
+        self._counter = itertools.count()
+        self._position_index = SortIndex()
+        self._search_index = SearchIndex()
+        self._sort_indexes: dict[str, SortIndex] = {}
+        self.changes: ChangeFeed[str] = ChangeFeed()
+        self.set_items(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def items(self) -> list[ListableT]:
+        return list(self._items.values())
+
+    def get(self, item_id: str) -> ListableT | None:
+        return self._items.get(item_id)
+
+    def set_items(self, items: Iterable[ListableT]) -> None:
+        with self._lock:
+            self._items.clear()
+            self._position_index = SortIndex()
+            self._search_index.clear()
+            self._sort_indexes.clear()
+            for item in items:
+                self._upsert(item)
+        self.changes.publish(ALL_ITEMS)
+
+    def upsert(self, item: ListableT) -> None:
+        """Insert a new item or replace the item with the same id."""
+        self._upsert(item)
+        self.changes.publish(item.list_id())
+
+    def _upsert(self, item: ListableT) -> None:
+        item_id = item.list_id()
+        with self._lock:
+            if item_id not in self._items:
+                self._position_index.add(item_id, _position_key(next(self._counter)))
+            self._items[item_id] = item
+            self._search_index.add(item_id, item.search_text())
+            for column, sort_index in self._sort_indexes.items():
+                sort_index.add(item_id, sort_key(getattr(item, column)))
+
+    def delete(self, item_id: str) -> None:
+        with self._lock:
+            if self._items.pop(item_id, None) is None:
+                return
+            self._position_index.remove(item_id)
+            self._search_index.remove(item_id)
+            for sort_index in self._sort_indexes.values():
+                sort_index.remove(item_id)
+        self.changes.publish(item_id)
+
+    def _sort_index(self, column: str) -> SortIndex:
+        if not column:
+            return self._position_index
+        # Sort values come from clients, every sorted column is indexed for good
+        if column not in self._sort_attributes:
+            raise ValueError(f"{self.item_class.__name__} can not be sorted by {column!r}")
+        sort_index = self._sort_indexes.get(column)
+        if sort_index is None:
+            sort_index = SortIndex((item_id, sort_key(getattr(item, column))) for item_id, item in self._items.items())
+            self._sort_indexes[column] = sort_index
+        return sort_index
+
+    def query(self, query: DataQuery) -> DataPage[ListableT]:
+        with self._lock:
+            sort_index = self._sort_index(query.sort_value)
+            # The insertion order is not reversed
+            reverse = query.sort_reverse and bool(query.sort_value)
+            matched = self._search_index.search(query.search_value) if query.search_value else None
+            cursor = decode_cursor(query.after) if query.after else None
+
+            if matched is None:
+                if cursor is None:
+                    ids = sort_index.slice(query.offset, query.limit, reverse)
+                else:
+                    ids = list(itertools.islice(sort_index.ids_after(cursor, reverse), query.limit))
+            elif len(matched) * math.log2(len(matched) + 1) < len(self._items):
+                # Few matches, sorting them by the cached keys is cheaper than a walk over the column
+                ordered = sort_index.sort(matched)
+                if cursor is None:
+                    start = query.offset
+                elif reverse:
+                    start = len(ordered) - bisect.bisect_left(ordered, cursor, key=sort_index.entry)
+                else:
+                    start = bisect.bisect_right(ordered, cursor, key=sort_index.entry)
+                if reverse:
+                    ordered.reverse()
+                ids = ordered[start : start + query.limit]
+            else:
+                ordered_ids = sort_index.ids_after(cursor, reverse) if cursor else sort_index.ids(reverse)
+                matching = (item_id for item_id in ordered_ids if item_id in matched)
+                start = 0 if cursor else query.offset
+                ids = list(itertools.islice(matching, start, start + query.limit))
+
+            next_cursor = encode_cursor(*sort_index.entry(ids[-1])) if len(ids) == query.limit else ""
+            return DataPage(
+                items=[self._items[item_id] for item_id in ids],
+                total=len(self._items) if matched is None else len(matched),
+                next_cursor=next_cursor,
+            )
@@ -0,0 +1,73 @@
+from collections.abc import Iterable
+
+from craftai.entities.listable import normalize_search_text
+
+NGRAM_SIZE = 3
+
+
+def _ngrams(text: str) -> set[str]:
+    return {text[i : i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+class SearchIndex:
+    """Trigram index answering substring queries over normalized item texts.
+
+    Texts are normalized once when an item is added. A query intersects the posting sets of its
+    trigrams, rarest first, and verifies the remaining candidates with a substring check, so only
+    the candidates are scanned instead of every item. Queries shorter than a trigram fall back to
+    a scan of the cached texts.
+    """
+
+    def __init__(self) -> None:
+        self._texts: dict[str, str] = {}
+        self._postings: dict[str, set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._texts
+
+    def add(self, key: str, text: str) -> None:
+        """Add or replace the text of an item."""
+        if key in self._texts:
+            self.remove(key)
+        self._texts[key] = text
+        for gram in _ngrams(text):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def add_many(self, entries: Iterable[tuple[str, str]]) -> None:
+        for key, text in entries:
+            self.add(key, text)
+
+    def remove(self, key: str) -> None:
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        for gram in _ngrams(text):
+            keys = self._postings[gram]
+            keys.discard(key)
+            if not keys:
+                del self._postings[gram]
+
+    def clear(self) -> None:
+        self._texts.clear()
+        self._postings.clear()
+
+    def search(self, value: str) -> set[str]:
+        """Keys of the items whose text contains the search value."""
+        value = normalize_search_text(value)
+        if not value:
+            return set(self._texts)
+
+        if len(value) < NGRAM_SIZE:
+            return {key for key, text in self._texts.items() if value in text}
+
+        postings = sorted((self._postings.get(gram, set()) for gram in _ngrams(value)), key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            if not candidates:
+                break
+            candidates &= keys
+
+        return {key for key in candidates if value in self._texts[key]}
@@ -0,0 +1,67 @@
+import bisect
+from collections.abc import Iterable, Iterator
+
+
+def sort_key(value: object) -> str:
+    return str(value).lower()
+
+
+class SortIndex:
+    """Item ids of a single column kept in sorted order.
+
+    Sort keys are computed once per item and cached. The order is a list of `(key, id)` pairs
+    maintained with binary search on insert and delete, so adding an item does not resort the
+    column, and the reverse order is a reversed view of the same list.
+    """
+
+    def __init__(self, entries: Iterable[tuple[str, str]] = ()):
+        self._keys: dict[str, str] = dict(entries)
+        self._order: list[tuple[str, str]] = sorted((key, item_id) for item_id, key in self._keys.items())
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def key(self, item_id: str) -> str:
+        return self._keys[item_id]
+
+    def add(self, item_id: str, key: str) -> None:
+        """Add an item or move it to the position of its new key."""
+        if self._keys.get(item_id) == key:
+            return
+        self.remove(item_id)
+        self._keys[item_id] = key
+        bisect.insort(self._order, (key, item_id))
+
+    def remove(self, item_id: str) -> None:
+        key = self._keys.pop(item_id, None)
+        if key is None:
+            return
+        del self._order[bisect.bisect_left(self._order, (key, item_id))]
+
+    def ids(self, reverse: bool = False) -> Iterator[str]:
+        order = reversed(self._order) if reverse else iter(self._order)
+        return (item_id for _, item_id in order)
+
+    def entry(self, item_id: str) -> tuple[str, str]:
+        return self._keys[item_id], item_id
+
+    def ids_after(self, cursor: tuple[str, str], reverse: bool = False) -> Iterator[str]:
+        """Ids following the `(key, id)` cursor in the column order, found by binary search."""
+        if reverse:
+            end = bisect.bisect_left(self._order, cursor)
+            return (self._order[i][1] for i in range(end - 1, -1, -1))
+        start = bisect.bisect_right(self._order, cursor)
+        return (self._order[i][1] for i in range(start, len(self._order)))
+
+    def slice(self, offset: int, limit: int, reverse: bool = False) -> list[str]:
+        """Ids of a page of the whole column, without walking the items before it."""
+        if reverse:
+            end = max(len(self._order) - offset, 0)
+            entries = self._order[max(end - limit, 0) : end][::-1]
+        else:
+            entries = self._order[offset : offset + limit]
+        return [item_id for _, item_id in entries]
+
+    def sort(self, item_ids: Iterable[str], reverse: bool = False) -> list[str]:
+        """Sort a subset of ids with the cached keys."""
+        return sorted(item_ids, key=lambda item_id: (self._keys[item_id], item_id), reverse=reverse)
@@ -0,0 +1,295 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Generic, TypeVar
+
+from craftai.backend.data_source.base import BaseDataSource, DataPage, DataQuery, decode_cursor, encode_cursor
+from craftai.backend.data_source.changes import ALL_ITEMS, ChangeFeed
+from craftai.backend.data_source.search_index import NGRAM_SIZE
+from craftai.backend.data_source.sort_index import sort_key
+from craftai.entities.listable import SEARCH_TEXT_SEPARATOR, Listable, normalize_search_text
+
+ListableT = TypeVar("ListableT", bound=Listable)
+
+DB_PATH_ENV = "CRAFTAI_DB_PATH"
+DEFAULT_DB_PATH = ".data/craftai.db"
+
+# Totals which do not have to be exact are counted up to this number of rows
+APPROXIMATE_COUNT_LIMIT = 1000
+# Bound parameters of a statement, the limit of older SQLite versions
+MAX_VARIABLES = 999
+# Items saved per statement by the bulk writes
+UPSERT_BATCH_SIZE = 1000
+
+
+def db_path() -> Path:
+    return Path(os.environ.get(DB_PATH_ENV, DEFAULT_DB_PATH))
+
+
+def _position_key(position: int) -> str:
+    return f"{position:016d}"
+
+
+def _search_phrase(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+class SqliteDataSource(BaseDataSource[ListableT], Generic[ListableT]):
+    """Data source over items persisted in an SQLite database.
+
+    Items are stored as JSON next to the columns queries run on: the normalized search text,
+    indexed by an FTS5 trigram table for substring search, and the sort key of every sort
+    attribute, each indexed together with the id. Search, sorting and paging run in SQL, so a
+    query only reads the rows of the page and nothing is loaded into the process up front.
+
+    The unsorted order is the insertion order and cursors use the same keys as
+    `InMemoryDataSource`. Ids of changed items are published to `changes`.
+    """
+
+    def __init__(self, item_class: type[ListableT], path: str | Path = ":memory:", table: str = ""):
+        self.item_class = item_class
+        self.path = path
+        self.table = table or f"{item_class.__name__.lower()}s"
+        self.changes: ChangeFeed[str] = ChangeFeed()
+        self._sort_columns = {attr: f"sort_{attr}" for attr in item_class.sort_attributes()}
+        self._search_columns = [f"search_{attr}" for attr in item_class.search_attributes()]
+        self._lock = threading.RLock()
+        self._connection: sqlite3.Connection | None = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connected on first use, so defining a source does not create the database
+        if self._connection is None:
+            if str(self.path) != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._create_tables(connection)
+            self._connection = connection
+        return self._connection
+
+    def _create_tables(self, connection: sqlite3.Connection) -> None:
+        sort_columns = "".join(f", {column} TEXT NOT NULL" for column in self._sort_columns.values())
+        with connection:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                f"position INTEGER PRIMARY KEY AUTOINCREMENT, id TEXT NOT NULL UNIQUE, data TEXT NOT NULL, "
+                f"search_text TEXT NOT NULL{sort_columns})"
+            )
+            for column in self._sort_columns.values():
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {self.table}_{column} ON {self.table} ({column}, id)")
+            connection.execute(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table}_search "
+                f"USING fts5({', '.join(self._search_columns)}, tokenize='trigram case_sensitive 1')"
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._connect().execute(f"SELECT count(*) FROM {self.table}").fetchone()
+        return int(count)
+
+    def data_version(self) -> int:
+        """Changes whenever another connection, possibly of another process, commits to the database."""
+        with self._lock:
+            (version,) = self._connect().execute("PRAGMA data_version").fetchone()
+        return int(version)
+
+    def _load(self, data: str) -> ListableT:
+        return self.item_class.parse_obj(json.loads(data))
+
+    def iter_items(self, batch_size: int = 500) -> Iterator[ListableT]:
+        """All items in insertion order, read in batches."""
+        position = 0
+        while True:
+            with self._lock:
+                rows = (
+                    self._connect()
+                    .execute(
+                        f"SELECT position, data FROM {self.table} WHERE position > ? ORDER BY position LIMIT ?",
+                        (position, batch_size),
+                    )
+                    .fetchall()
+                )
+            if not rows:
+                return
+            for position, data in rows:
+                yield self._load(data)
+
+    @property
+    def items(self) -> list[ListableT]:
+        return list(self.iter_items())
+
+    def get(self, item_id: str) -> ListableT | None:
+        with self._lock:
+            row = self._connect().execute(f"SELECT data FROM {self.table} WHERE id = ?", (item_id,)).fetchone()
+        return None if row is None else self._load(row[0])
+
+    def get_many(self, item_ids: Iterable[str]) -> dict[str, ListableT]:
+        """The stored items among the ids, by id."""
+        item_ids = list(item_ids)
+        found: dict[str, ListableT] = {}
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(item_ids), MAX_VARIABLES):
+                chunk = item_ids[start : start + MAX_VARIABLES]
+                rows = connection.execute(
+                    f"SELECT id, data FROM {self.table} WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((item_id, self._load(data)) for item_id, data in rows)
+        return found
+
+    def _row(self, item: ListableT) -> dict[str, Any]:
+        return {
+            "id": item.list_id(),
+            "data": item.json(),
+            "search_text": item.search_text(),
+            **{column: sort_key(getattr(item, attr)) for attr, column in self._sort_columns.items()},
+        }
+
+    def _upsert(self, connection: sqlite3.Connection, items: Iterable[ListableT]) -> int:
+        """Save the items with one statement per table, returns the number of saved items."""
+        count = 0
+        # An item repeated in the batch is saved once, as its last occurrence
+        rows: dict[str, dict[str, Any]] = {}
+        for item in items:
+            row = self._row(item)
+            rows[row["id"]] = row
+            count += 1
+        if not rows:
+            return 0
+        columns = list(next(iter(rows.values())))
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != "id")
+        # The conflict update keeps the position, so a replaced item keeps its place
+        connection.executemany(
+            f"INSERT INTO {self.table} ({', '.join(columns)}) VALUES ({', '.join(f':{c}' for c in columns)}) "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}",
+            rows.values(),
+        )
+        item_ids = list(rows)
+        positions: list[tuple[str, int]] = []
+        for start in range(0, len(item_ids), MAX_VARIABLES):
+            chunk = item_ids[start : start + MAX_VARIABLES]
+            positions.extend(
+                connection.execute(
+                    f"SELECT id, position FROM {self.table} WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+                )
+            )
+        connection.executemany(
+            f"DELETE FROM {self.table}_search WHERE rowid = ?", ((position,) for _, position in positions)
+        )
+        # One column per attribute, FTS5 does not index text past the separator
+        connection.executemany(
+            f"INSERT INTO {self.table}_search (rowid, {', '.join(self._search_columns)}) "
+            f"VALUES (?{', ?' * len(self._search_columns)})",
+            ((position, *rows[item_id]["search_text"].split(SEARCH_TEXT_SEPARATOR)) for item_id, position in positions),
+        )
+        return count
+
+    def upsert(self, item: ListableT) -> None:
+        """Insert a new item or replace the item with the same id."""
+        with self._lock, self._connect() as connection:
+            self._upsert(connection, [item])
+        self.changes.publish(item.list_id())
+
+    def upsert_many(self, items: Iterable[ListableT], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """Save the items in a single transaction, returns the number of saved items."""
+        count = 0
+        iterator = iter(items)
+        with self._lock, self._connect() as connection:
+            while batch := list(itertools.islice(iterator, batch_size)):
+                count += self._upsert(connection, batch)
+        self.changes.publish(ALL_ITEMS)
+        return count
+
+    def set_items(self, items: Iterable[ListableT]) -> None:
+        with self._lock, self._connect() as connection:
+            connection.execute(f"DELETE FROM {self.table}")
+            connection.execute(f"DELETE FROM {self.table}_search")
+            iterator = iter(items)
+            while batch := list(itertools.islice(iterator, UPSERT_BATCH_SIZE)):
+                self._upsert(connection, batch)
+        self.changes.publish(ALL_ITEMS)
+
+    def delete(self, item_id: str) -> None:
+        with self._lock, self._connect() as connection:
+            row = connection.execute(f"DELETE FROM {self.table} WHERE id = ? RETURNING position", (item_id,)).fetchone()
+            if row is None:
+                return
+            connection.execute(f"DELETE FROM {self.table}_search WHERE rowid = ?", row)
+        self.changes.publish(item_id)
+
+    def _search_filter(self, search_value: str) -> tuple[str, list[Any]]:
+        value = normalize_search_text(search_value)
+        if not value:
+            return "", []
+        if len(value) < NGRAM_SIZE:
+            # Too short for the trigram index
+            return "instr(search_text, ?) > 0", [value]
+        return (
+            f"position IN (SELECT rowid FROM {self.table}_search WHERE {self.table}_search MATCH ?)",
+            [_search_phrase(value)],
+        )
+
+    def query(self, query: DataQuery) -> DataPage[ListableT]:
+        if query.sort_value and query.sort_value not in self._sort_columns:
+            raise ValueError(f"{self.item_class.__name__} can not be sorted by {query.sort_value!r}")
+        sort_column = self._sort_columns.get(query.sort_value, "")
+        # The insertion order is not reversed
+        reverse = query.sort_reverse and bool(sort_column)
+
+        conditions, params = [], []
+        search_filter, search_params = self._search_filter(query.search_value)
+        if search_filter:
+            conditions.append(search_filter)
+            params.extend(search_params)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        page_conditions, page_params = list(conditions), list(params)
+        if query.after:
+            key, item_id = decode_cursor(query.after)
+            if sort_column:
+                page_conditions.append(f"({sort_column}, id) {'<' if reverse else '>'} (?, ?)")
+                page_params.extend([key, item_id])
+            else:
+                page_conditions.append("position > ?")
+                page_params.append(int(key))
+        page_where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        direction = "DESC" if reverse else "ASC"
+        order = f"{sort_column} {direction}, id {direction}" if sort_column else "position"
+        key_column = sort_column or "position"
+
+        with self._lock:
+            connection = self._connect()
+            rows = connection.execute(
+                f"SELECT {key_column}, id, data FROM {self.table} {page_where} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*page_params, query.limit, 0 if query.after else query.offset],
+            ).fetchall()
+            if query.exact_total:
+                (total,) = connection.execute(f"SELECT count(*) FROM {self.table} {where}", params).fetchone()
+                total_exact = True
+            else:
+                (total,) = connection.execute(
+                    f"SELECT count(*) FROM (SELECT 1 FROM {self.table} {where} LIMIT ?)",
+                    [*params, APPROXIMATE_COUNT_LIMIT],
+                ).fetchone()
+                total_exact = total < APPROXIMATE_COUNT_LIMIT
+
+        next_cursor = ""
+        if len(rows) == query.limit:
+            key, item_id, _ = rows[-1]
+            next_cursor = encode_cursor(key if sort_column else _position_key(key), item_id)
+        return DataPage(
+            items=[self._load(data) for _, _, data in rows],
+            total=total,
+            next_cursor=next_cursor,
+            total_exact=total_exact,
+        )
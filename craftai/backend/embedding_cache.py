@@ -0,0 +1,193 @@
+import collections
+import contextlib
+import hashlib
+import json
+import os
+import re
+import threading
+import unicodedata
+from collections.abc import Callable, Iterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, where the store is not shared between processes
+    fcntl = None  # type: ignore[assignment]
+
+DEFAULT_MAX_ENTRIES = 10_000
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize unicode and whitespace, texts differing only by them share an embedding."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_key(text: str, model_id: str) -> str:
+    return hashlib.sha256(f"{model_id}\x00{normalize_text(text)}".encode()).hexdigest()
+
+
+class DiskEmbeddingStore:
+    """Append-only store of float32 vectors, read through a memory map.
+
+    `vectors.f32` holds the vectors row after row and `keys.txt` the key of each row. A vector is
+    written before its key, vectors left without a key by a crash are cut off on open. Processes
+    sharing the directory write under a file lock, and pick up the rows appended by the others
+    before they write.
+    """
+
+    def __init__(self, directory: str | os.PathLike[str]):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._vectors_path = self.directory / "vectors.f32"
+        self._keys_path = self.directory / "keys.txt"
+        self._meta_path = self.directory / "meta.json"
+        self._lock_path = self.directory / "lock"
+        self._lock = threading.Lock()
+        self._rows: dict[str, int] = {}
+        # Rows and bytes of `keys.txt` read so far
+        self._row_count = 0
+        self._keys_size = 0
+        self._map: np.memmap | None = None
+        # Vector size, known once the first vector is stored
+        self.dim = 0
+
+        with self._file_lock():
+            self._sync()
+            # Rows appended after an incomplete key or an orphan vector would be misaligned
+            if self._keys_path.exists() and self._keys_path.stat().st_size > self._keys_size:
+                os.truncate(self._keys_path, self._keys_size)
+            if self.dim and self._vectors_path.exists():
+                if self._vectors_path.stat().st_size > self._row_count * self.dim * 4:
+                    os.truncate(self._vectors_path, self._row_count * self.dim * 4)
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        with self._lock_path.open("a") as f:
+            if fcntl is not None:
+                # Released when the file is closed
+                fcntl.flock(f, fcntl.LOCK_EX)
+            yield
+
+    def _sync(self) -> None:
+        """Read the rows appended since the last read, the file lock must be held."""
+        if not self.dim and self._meta_path.exists():
+            self.dim = json.loads(self._meta_path.read_text())["dim"]
+        if not self._keys_path.exists():
+            return
+        with self._keys_path.open("rb") as f:
+            f.seek(self._keys_size)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._rows.setdefault(line.decode().strip(), self._row_count)
+                self._row_count += 1
+                self._keys_size += len(line)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, key: str) -> list[float] | None:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        with self._lock:
+            if self._map is None or row >= self._map.shape[0]:
+                self._map = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(self._row_count, self.dim))
+            return self._map[row].tolist()
+
+    def put_many(self, entries: Sequence[tuple[str, Sequence[float]]]) -> None:
+        with self._lock, self._file_lock():
+            self._sync()
+            entries = [(key, vector) for key, vector in entries if key not in self._rows]
+            if not entries:
+                return
+            if not self.dim:
+                self.dim = len(entries[0][1])
+                self._meta_path.write_text(json.dumps({"dim": self.dim}))
+
+            vectors = np.asarray([vector for _, vector in entries], dtype=np.float32).reshape(-1, self.dim)
+            with self._vectors_path.open("ab") as f:
+                f.write(vectors.tobytes())
+            with self._keys_path.open("a") as f:
+                f.writelines(f"{key}\n" for key, _ in entries)
+            self._sync()
+
+
+class EmbeddingCache:
+    """Content-addressed cache in front of an embedding function.
+
+    Vectors are keyed by the hash of the normalized text and the model id. Lookups go through an
+    in-memory LRU tier and then through the optional disk tier, which survives restarts; only the
+    texts missing in both are embedded, in a single call.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[list[str]], Sequence[Any]],
+        model_id: str,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        directory: str | os.PathLike[str] | None = None,
+    ):
+        self._embed = embed
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self._memory: collections.OrderedDict[str, list[float]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        safe_model_id = re.sub(r"[^\w.-]", "_", model_id)
+        self._disk = DiskEmbeddingStore(Path(directory) / safe_model_id) if directory is not None else None
+        self.hits = 0
+        self.misses = 0
+
+    def embed(self, texts: Sequence[str]) -> list[list[float]]:
+        keys = [embedding_key(text, self.model_id) for text in texts]
+        vectors: dict[str, list[float]] = {}
+        missing: dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            vector = self._get(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                vectors[key] = vector
+
+        if missing:
+            embedded = [[float(x) for x in vector] for vector in self._embed(list(missing.values()))]
+            computed = list(zip(missing, embedded))
+            if self._disk is not None:
+                self._disk.put_many(computed)
+            for key, vector in computed:
+                self._remember(key, vector)
+                vectors[key] = vector
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+        return [vectors[key] for key in keys]
+
+    def _get(self, key: str) -> list[float] | None:
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+        if self._disk is None:
+            return None
+        vector = self._disk.get(key)
+        if vector is not None:
+            self._remember(key, vector)
+        return vector
+
+    def _remember(self, key: str, vector: list[float]) -> None:
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
@@ -0,0 +1,112 @@
+import dataclasses
+import math
+import threading
+
+# Upper bounds of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+@dataclasses.dataclass
+class Histogram:
+    """Counts of observed values per bucket, the last bucket has no upper bound."""
+
+    bounds: tuple[float, ...] = LATENCY_BUCKETS
+    counts: list[int] = dataclasses.field(default_factory=list)
+    count: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+
+    def __post_init__(self) -> None:
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, value: float) -> None:
+        index = next((index for index, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        self.counts[index] += 1
+        self.count += 1
+        self.total += value
+        self.maximum = max(self.maximum, value)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the quantile, the maximum for the last bucket."""
+        if not self.count:
+            return 0.0
+        rank = max(math.ceil(q * self.count), 1)
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+
+@dataclasses.dataclass
+class HandlerStats:
+    kind: str
+    name: str
+    latency: Histogram = dataclasses.field(default_factory=Histogram)
+    # Serialized size of the state deltas the handler produced
+    delta_bytes: int = 0
+    max_delta_bytes: int = 0
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Call counts, latency histograms and delta sizes of state handlers, kept per process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[tuple[str, str], HandlerStats] = {}
+
+    def observe(self, kind: str, name: str, seconds: float, delta_bytes: int = 0) -> None:
+        with self._lock:
+            stats = self._stats.get((kind, name))
+            if stats is None:
+                stats = self._stats[kind, name] = HandlerStats(kind, name)
+            stats.latency.observe(seconds)
+            stats.delta_bytes += delta_bytes
+            stats.max_delta_bytes = max(stats.max_delta_bytes, delta_bytes)
+
+    def snapshot(self) -> list[HandlerStats]:
+        """Copies of the stats, the slowest handlers in total first."""
+        with self._lock:
+            stats = [
+                dataclasses.replace(entry, latency=dataclasses.replace(entry.latency, counts=[*entry.latency.counts]))
+                for entry in self._stats.values()
+            ]
+        return sorted(stats, key=lambda entry: entry.latency.total, reverse=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    def prometheus(self) -> str:
+        """The stats in the Prometheus text exposition format."""
+        lines = [
+            "# HELP craftai_handler_seconds Latency of state event handlers and computed vars.",
+            "# TYPE craftai_handler_seconds histogram",
+        ]
+        stats = self.snapshot()
+        for entry in stats:
+            labels = f'kind="{_label(entry.kind)}",name="{_label(entry.name)}"'
+            cumulative = 0
+            for bound, count in zip((*entry.latency.bounds, math.inf), entry.latency.counts):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else repr(bound)
+                lines.append(f'craftai_handler_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"craftai_handler_seconds_sum{{{labels}}} {entry.latency.total}")
+            lines.append(f"craftai_handler_seconds_count{{{labels}}} {entry.latency.count}")
+        lines += [
+            "# HELP craftai_handler_delta_bytes_total Serialized size of the state deltas sent by event handlers.",
+            "# TYPE craftai_handler_delta_bytes_total counter",
+        ]
+        for entry in stats:
+            if entry.kind == "event":
+                lines.append(f'craftai_handler_delta_bytes_total{{name="{_label(entry.name)}"}} {entry.delta_bytes}')
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
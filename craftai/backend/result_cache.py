@@ -0,0 +1,70 @@
+import collections
+import threading
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+ResultT = TypeVar("ResultT")
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class ResultCache(Generic[ResultT]):
+    """LRU cache of query results, bounded by the estimated size of the results in bytes.
+
+    Results are grouped in namespaces (e.g. collections) with a version each. Writing to a
+    namespace bumps its version, which makes every result cached for the older version
+    unreachable; those age out of the LRU order. A result is stored under the version read
+    before its query was sent, so a write racing with the query can not leave a stale hit.
+    """
+
+    def __init__(self, size_of: Callable[[ResultT], int], max_bytes: int = DEFAULT_MAX_BYTES):
+        self._size_of = size_of
+        self.max_bytes = max_bytes
+        self._entries: collections.OrderedDict[tuple[str, int, Hashable], tuple[ResultT, int]] = (
+            collections.OrderedDict()
+        )
+        self._versions: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def version(self, namespace: str) -> int:
+        return self._versions.get(namespace, 0)
+
+    def get(self, namespace: str, key: Hashable) -> ResultT | None:
+        entry_key = (namespace, self.version(namespace), key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(entry_key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, namespace: str, key: Hashable, result: ResultT, version: int) -> None:
+        size = self._size_of(result)
+        if size > self.max_bytes or version != self.version(namespace):
+            return
+        entry_key = (namespace, version, key)
+        with self._lock:
+            previous = self._entries.pop(entry_key, None)
+            if previous is not None:
+                self.size_bytes -= previous[1]
+            self._entries[entry_key] = (result, size)
+            self.size_bytes += size
+            while self.size_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size_bytes -= evicted_size
+                self.evictions += 1
+
+    def invalidate(self, namespace: str) -> None:
+        with self._lock:
+            self._versions[namespace] = self.version(namespace) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size_bytes = 0
@@ -0,0 +1,165 @@
+import abc
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+DEFAULT_TTL = 300.0
+DEFAULT_PREFIX = "craftai"
+
+# Number of writes between the sweeps of expired entries in the local backend
+SWEEP_INTERVAL = 256
+
+
+class CacheBackend(abc.ABC):
+    """Key value store behind a `SharedCache`, values are bytes."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes | None:
+        pass
+
+    @abc.abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    @abc.abstractmethod
+    def touch(self, key: str, ttl: float) -> bool:
+        """Expire the key in `ttl` seconds from now, False when the key is missing."""
+
+    @abc.abstractmethod
+    def incr(self, key: str) -> int:
+        """Increment the integer stored at the key, a missing key counts as 0."""
+
+
+class LocalCacheBackend(CacheBackend):
+    """Backend in the process memory, shared by all sessions of the process.
+
+    It follows the semantics of the Redis backend, so it also stands in for Redis in tests.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values: dict[str, tuple[bytes, float | None]] = {}
+        self._writes = 0
+
+    def get(self, key: str) -> bytes | None:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= self._clock():
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._values[key] = (value, self._clock() + ttl)
+            self._writes += 1
+            if self._writes % SWEEP_INTERVAL == 0:
+                self._evict_expired()
+
+    def touch(self, key: str, ttl: float) -> bool:
+        value = self.get(key)
+        if value is None:
+            return False
+        with self._lock:
+            self._values[key] = (value, self._clock() + ttl)
+            return True
+
+    def _evict_expired(self) -> None:
+        # Entries of old versions are never read again, they are only dropped here
+        now = self._clock()
+        expired = [key for key, (_, expires_at) in self._values.items() if expires_at is not None and expires_at <= now]
+        for key in expired:
+            del self._values[key]
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._values.get(key, (b"0", None))[0]) + 1
+            self._values[key] = (str(value).encode(), None)
+            return value
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend in Redis, shared by all processes which use the same Redis."""
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisCacheBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url))
+
+    def get(self, key: str) -> bytes | None:
+        value = self._client.get(key)
+        return None if value is None else bytes(value)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._client.set(key, value, px=int(ttl * 1000))
+
+    def touch(self, key: str, ttl: float) -> bool:
+        return bool(self._client.pexpire(key, int(ttl * 1000)))
+
+    def incr(self, key: str) -> int:
+        return int(self._client.incr(key))
+
+
+def cache_backend(redis_url: str | None = None) -> CacheBackend:
+    return RedisCacheBackend.from_url(redis_url) if redis_url else LocalCacheBackend()
+
+
+class SharedCache:
+    """Read-through cache shared between sessions, and between processes with Redis.
+
+    Entries are grouped in namespaces with a version each, kept in the backend next to the
+    entries. `invalidate` bumps the version, which makes the entries of older versions
+    unreachable in every process; they expire after `ttl` seconds. Concurrent misses of the
+    same key in a process wait for a single load.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = DEFAULT_TTL, prefix: str = DEFAULT_PREFIX):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def version(self, namespace: str) -> int:
+        value = self.backend.get(f"{self.prefix}:{namespace}:version")
+        return 0 if value is None else int(value)
+
+    def invalidate(self, namespace: str) -> None:
+        self.backend.incr(f"{self.prefix}:{namespace}:version")
+
+    def get_or_load(self, namespace: str, key: str, load: Callable[[], bytes]) -> bytes:
+        # The version is read before loading, so a write racing with the load leaves the
+        # loaded value under the old version
+        entry_key = f"{self.prefix}:{namespace}:{self.version(namespace)}:{key}"
+        value = self.backend.get(entry_key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        with self._lock:
+            loading = self._loading.setdefault(entry_key, threading.Lock())
+        try:
+            with loading:
+                value = self.backend.get(entry_key)
+                if value is not None:
+                    # Loaded by a concurrent miss
+                    self.hits += 1
+                    return value
+                self.misses += 1
+                value = load()
+                self.backend.set(entry_key, value, self.ttl)
+                return value
+        finally:
+            with self._lock:
+                self._loading.pop(entry_key, None)
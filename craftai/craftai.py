@@ -1,14 +1,22 @@
 """Welcome to Reflex!."""
 
-# Import all the pages.
-
 import reflex as rx
+from reflex.utils import console
 
-import craftai.frontend.pages as pages  # noqa: F401
 from craftai.frontend import styles
+from craftai.frontend.instrumentation import instrument, metrics_enabled
+from craftai.frontend.pages import page_registry
+
+# Import the pages, only the routes in CRAFTAI_PAGES when it is set.
+page_registry.load()
+console.debug(f"Page modules by startup cost:\n{page_registry.format_report()}")
 
 # Create the app.
 app = rx.App(
     style=styles.base_style,
     stylesheets=styles.base_stylesheets,
 )
+
+# Record handler latencies when enabled with CRAFTAI_METRICS=1.
+if metrics_enabled():
+    instrument(app)
@@ -1,6 +1,44 @@
-import reflex as rx
+from typing import Any
 
+import pydantic.v1 as pydantic
 
-class ChromaDbConfig(rx.Base):
+from craftai.entities.config.base import BaseConfig
+
+# Embedding functions a config can name, mapped to their classes in
+# `chromadb.utils.embedding_functions`. Only functions calling an embedding API are allowed,
+# a config must not load arbitrary code or models into the app.
+EMBEDDING_FUNCTIONS: dict[str, str] = {
+    "openai": "OpenAIEmbeddingFunction",
+    "cohere": "CohereEmbeddingFunction",
+    "huggingface": "HuggingFaceEmbeddingFunction",
+    "ollama": "OllamaEmbeddingFunction",
+    "jina": "JinaEmbeddingFunction",
+    "google_generative_ai": "GoogleGenerativeAiEmbeddingFunction",
+    "google_vertex": "GoogleVertexEmbeddingFunction",
+}
+
+
+class ChromaDbConfig(BaseConfig):
     host: str
     port: int
+    # Name of the embedding function of the collections in `EMBEDDING_FUNCTIONS`, created with
+    # the keyword arguments in `embedding_function_args`. The thin client has no default one,
+    # queries and upserts need it, health checks and tool discovery work without it.
+    embedding_function: str | None = None
+    embedding_function_args: dict[str, Any] = {}
+    # Requests arriving within `batch_delay` seconds are sent in one call of at most `batch_size`
+    batch_size: int = 64
+    batch_delay: float = 0.005
+    # Embeddings computed for queries and documents are cached in memory and, if a directory is
+    # set, on disk
+    embedding_cache_size: int = 10_000
+    embedding_cache_dir: str | None = None
+    # Size of the query result cache in bytes, 0 disables it
+    result_cache_bytes: int = 16 * 1024 * 1024
+
+    @pydantic.validator("embedding_function")
+    @classmethod
+    def _known_embedding_function(cls, value: str | None) -> str | None:
+        if value is not None and value not in EMBEDDING_FUNCTIONS:
+            raise ValueError(f"unknown embedding function, expected one of {', '.join(EMBEDDING_FUNCTIONS)}")
+        return value
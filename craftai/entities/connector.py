@@ -5,14 +5,29 @@ import reflex as rx
 from craftai.entities.listable import Listable
 
 
-class Connector(rx.Base, Listable):
+class ConnectorRow(rx.Base):
+    """Fields of a connector shown in lists, without its config."""
+
+    name: str
+    connector_type: str
+
+
+class Connector(Listable):
     name: str
     connector_type: str
     connector_data: dict[str, Any]
 
-    def check_search_string(self, value: str) -> bool:
-        return value.lower() in self.name.lower() or value.lower() in self.connector_type.lower()
+    @classmethod
+    def id_attribute(cls) -> str:
+        return "name"
+
+    @classmethod
+    def search_attributes(cls) -> list[str]:
+        return ["name", "connector_type"]
 
     @classmethod
     def sort_attributes(cls) -> list[str]:
         return ["name", "connector_type"]
+
+    def row(self) -> ConnectorRow:
+        return ConnectorRow(name=self.name, connector_type=self.connector_type)
@@ -1,16 +1,42 @@
 import abc
+import unicodedata
 
 import reflex as rx
 
+# Joins attribute texts in `Listable.search_text`, it can not appear in a normalized search string
+SEARCH_TEXT_SEPARATOR = "\x00"
+
+
+def normalize_search_text(value: str) -> str:
+    """Normalize a text for case-insensitive substring search."""
+    return unicodedata.normalize("NFKC", value).casefold().replace(SEARCH_TEXT_SEPARATOR, "")
+
 
 class Listable(rx.Base, abc.ABC):
     """Base class for entities which can be used in a list."""
 
+    @classmethod
     @abc.abstractmethod
-    def check_search_string(self, value: str) -> bool:
-        pass
+    def id_attribute(cls) -> str:
+        """Attribute which uniquely identifies an item in a list."""
 
+    @classmethod
     @abc.abstractmethod
+    def search_attributes(cls) -> list[str]:
+        """Attributes matched against a search string."""
+
     @classmethod
+    @abc.abstractmethod
     def sort_attributes(cls) -> list[str]:
         pass
+
+    def list_id(self) -> str:
+        return str(getattr(self, self.id_attribute()))
+
+    def search_text(self) -> str:
+        return SEARCH_TEXT_SEPARATOR.join(
+            normalize_search_text(str(getattr(self, attr))) for attr in self.search_attributes()
+        )
+
+    def check_search_string(self, value: str) -> bool:
+        return normalize_search_text(value) in self.search_text()
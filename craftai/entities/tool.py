@@ -0,0 +1,8 @@
+import reflex as rx
+
+
+class Tool(rx.Base):
+    """A function exposed by a connector which agents can execute."""
+
+    name: str
+    description: str
@@ -161,6 +161,8 @@ def menu_button() -> rx.Component:
     )
 
 
+# Memoized, the layout is compiled once into the shared components instead of into every page
+@rx.memo
 def navbar() -> rx.Component:
     """The navbar.
 
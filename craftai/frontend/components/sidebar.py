@@ -97,6 +97,8 @@ def sidebar_item(text: str, url: str, icon: str = "layout-dashboard") -> rx.Comp
     )
 
 
+# Memoized, the layout is compiled once into the shared components instead of into every page
+@rx.memo
 def sidebar() -> rx.Component:
     """The sidebar.
 
@@ -1,101 +1,196 @@
-import abc
+import dataclasses
+from typing import Any
 
 import reflex as rx
 
+from craftai.backend.data_source.base import BaseDataSource, DataPage, DataQuery
+from craftai.backend.data_source.memory import InMemoryDataSource
+from craftai.entities.listable import Listable
+from craftai.frontend.paged_state import PagedState
+from craftai.frontend.state_serialization import OutOfBandLists
+
 from .status_badge import status_badge
 
+# Height of a table row, the windowed mode derives the visible rows from the scroll position
+ROW_HEIGHT = 64
+# Rows mounted above and below the visible ones, so that short scrolls do not show empty space
+WINDOW_OVERSCAN = 5
+TABLE_WINDOW_ID = "table-window"
+# The first visible row is sent once scrolling pauses for this long, not on every scroll event
+SCROLL_DEBOUNCE_MS = 80
+
+# Icon, color scheme and title of the dialog opened by each row action
+DIALOG_ACTIONS: dict[str, tuple[str, str, str]] = {
+    "approve": ("check", "grass", "Approve Dialog"),
+    "edit": ("square-pen", "blue", "Edit Dialog"),
+    "delete": ("trash-2", "tomato", "Delete Dialog"),
+}
+
 
-class Item(rx.Base):
+class Item(Listable):
     """The item class."""
 
+    pipeline: str
+    workflow: str
+    status: str
+    timestamp: str
+    duration: str
 
-class TableState(rx.State, abc.ABC):
-    """The state class."""
+    @classmethod
+    def id_attribute(cls) -> str:
+        return "pipeline"
 
-    items: list[Item] = []
+    @classmethod
+    def search_attributes(cls) -> list[str]:
+        return ["pipeline", "status", "workflow", "timestamp", "duration"]
 
-    search_value: str = ""
-    sort_value: str = ""
-    sort_reverse: bool = False
+    @classmethod
+    def sort_attributes(cls) -> list[str]:
+        return ["pipeline", "status", "workflow", "timestamp", "duration"]
 
-    total_items: int = 0
-    offset: int = 0
-    limit: int = 12  # Number of rows per page
 
-    @rx.var(cache=True)
-    def filtered_sorted_items(self) -> list[Item]:
-        items = self.items
-
-        # Filter items based on selected item
-        if self.sort_value:
-            items = sorted(
-                items,
-                key=lambda item: str(getattr(item, self.sort_value)).lower(),
-                reverse=self.sort_reverse,
-            )
+# Items shared by all sessions, the table state only keeps the current page.
+items_source: InMemoryDataSource[Item] = InMemoryDataSource(Item)
 
-        # Filter items based on search value
-        if self.search_value:
-            search_value = self.search_value.lower()
-            items = [
-                item
-                for item in items
-                if any(
-                    search_value in str(getattr(item, attr)).lower()
-                    for attr in [
-                        "pipeline",
-                        "status",
-                        "workflow",
-                        "timestamp",
-                        "duration",
-                    ]
-                )
-            ]
-
-        return items
 
-    @rx.var(cache=True)
-    def page_number(self) -> int:
-        return (self.offset // self.limit) + 1
+class TableState(OutOfBandLists, PagedState, rx.State):
+    """The state class.
 
-    @rx.var(cache=True)
-    def total_pages(self) -> int:
-        return (self.total_items // self.limit) + (1 if self.total_items % self.limit else 0)
+    Only the rows of the current page are kept in the state, filtering, sorting and paging are
+    delegated to the data source returned by `_data_source`. The page itself stays on the backend,
+    the client receives the window of rows it mounts. The rows are persisted out of band, events
+    which do not load rows only persist the scalar vars.
+    """
+
+    _out_of_band_lists = {"_page_items": "_page_version"}
+
+    _page_items: list[Item] = []
+    # Incremented whenever `_page_items` is assigned
+    _page_version: int = 0
 
-    @rx.var(cache=True, initial_value=[])
-    def get_current_page(self) -> list[Item]:
-        start_index = self.offset
-        end_index = start_index + self.limit
-        return self.filtered_sorted_items[start_index:end_index]
+    # Rows of the page mounted on the client, a window size of 0 mounts the whole page
+    window_start: int = 0
+    window_size: int = 0
 
-    def prev_page(self) -> None:
-        if self.page_number > 1:
-            self.offset -= self.limit
+    # Infinite scroll, further rows are fetched by cursor and appended to the loaded ones. The
+    # cursor stays on the backend, it is empty once all rows are loaded.
+    infinite: bool = False
+    total_exact: bool = True
+    _next_cursor: str = ""
 
-    def next_page(self) -> None:
-        if self.page_number < self.total_pages:
-            self.offset += self.limit
+    # Row opened in the shared dialog and the action it was opened for
+    selected_id: str = ""
+    dialog_action: str = ""
 
-    def first_page(self) -> None:
-        self.offset = 0
+    def _data_source(self) -> BaseDataSource[Item]:
+        return items_source
 
-    def last_page(self) -> None:
-        self.offset = (self.total_pages - 1) * self.limit
+    @rx.var(cache=True)
+    def loaded_label(self) -> str:
+        total = str(self.total_items) if self.total_exact else f"~{self.total_items}"
+        return f"{len(self._page_items)} of {total}"
+
+    @rx.var(cache=True)
+    def visible_items(self) -> list[Item]:
+        if not self.window_size:
+            return self._page_items
+        return self._page_items[self.window_start : self.window_start + self.window_size]
 
-    def load_items(self, items: list[Item]) -> None:
-        self.items = items
+    @rx.var(cache=True)
+    def top_spacer_height(self) -> str:
+        return f"{self.window_start * ROW_HEIGHT}px"
 
-    def toggle_sort(self) -> None:
-        self.sort_reverse = not self.sort_reverse
-        self.load_entries()
+    @rx.var(cache=True)
+    def bottom_spacer_height(self) -> str:
+        hidden = len(self._page_items) - self.window_start - len(self.visible_items)
+        return f"{max(hidden, 0) * ROW_HEIGHT}px"
 
+    @rx.var(cache=True)
+    def selected_item(self) -> Item | None:
+        return next((item for item in self._page_items if item.list_id() == self.selected_id), None)
 
-def _create_dialog(item: Item, icon_name: str, color_scheme: str, dialog_title: str) -> rx.Component:
+    @rx.var(cache=True)
+    def dialog_open(self) -> bool:
+        return bool(self.dialog_action)
+
+    def _page_query(self, after: str = "") -> DataQuery:
+        return DataQuery(
+            offset=0 if self.infinite else self.offset,
+            limit=self._query_limit(),
+            sort_value=self.sort_value,
+            sort_reverse=self.sort_reverse,
+            search_value=self.search_value,
+            after=after,
+            # Scrolling does not need an exact count, sources may skip the full scan
+            exact_total=not self.infinite,
+        )
+
+    def _query_limit(self) -> int:
+        if not self.infinite:
+            return self.limit
+        # Every fetch covers a window past the last visible row, so a load which does not make
+        # the table scrollable still loads enough rows and the next scroll reaches further rows
+        return max(self.limit, self.window_size + WINDOW_OVERSCAN)
+
+    def _set_page(self, page: DataPage[Item]) -> None:
+        self._page_items = page.items
+        self._page_version += 1
+        self.window_start = 0
+        self._set_page_info(page)
+
+    def _set_page_info(self, page: DataPage[Item]) -> None:
+        self.total_items = page.total
+        self.total_exact = page.total_exact
+        self._next_cursor = page.next_cursor
+
+    def _reload_list(self, name: str) -> list[Any]:
+        # The page as the vars describe it, enough rows for the window when scrolling
+        limit = self._query_limit()
+        if self.infinite:
+            limit = max(limit, self.window_start + self.window_size + WINDOW_OVERSCAN)
+        page = self._data_source().query(dataclasses.replace(self._page_query(), limit=limit))
+        # Further rows are loaded after the reloaded ones, a backend var so the client has no copy
+        self._backend_vars["_next_cursor"] = page.next_cursor
+        return list(page.items)
+
+    def load_more(self) -> None:
+        """Append the rows following the loaded ones, only the new rows are queried."""
+        if not self._next_cursor:
+            return
+        page = self._data_source().query(self._page_query(after=self._next_cursor))
+        self._page_items = self._page_items + page.items
+        self._page_version += 1
+        self._set_page_info(page)
+
+    def clear_search_value(self) -> rx.event.EventHandler:
+        return self.set_search_value("")
+
+    def set_first_visible_row(self, value: int) -> rx.event.EventHandler | None:
+        first_visible = int(value or 0)
+        self.window_start = max(first_visible - WINDOW_OVERSCAN, 0)
+        if self.infinite and self.window_start + self.window_size + WINDOW_OVERSCAN >= len(self._page_items):
+            return type(self).load_more
+        return None
+
+    def change_dialog_open(self, value: bool) -> None:
+        if not value:
+            self.dialog_action = ""
+            self.selected_id = ""
+
+
+def _item_dialog() -> rx.Component:
+    # A single dialog shared by all rows, it shows the row it was opened for
+    item = TableState.selected_item
     return rx.dialog.root(
-        rx.dialog.trigger(rx.icon_button(rx.icon(icon_name), color_scheme=color_scheme, size="2", variant="solid")),
         rx.dialog.content(
             rx.vstack(
-                rx.dialog.title(dialog_title),
+                rx.dialog.title(
+                    rx.match(
+                        TableState.dialog_action,
+                        *[(action, title) for action, (_, _, title) in DIALOG_ACTIONS.items()],
+                        "",
+                    )
+                ),
                 rx.dialog.description(
                     rx.vstack(
                         rx.text(item.pipeline),
@@ -106,30 +201,38 @@ def _create_dialog(item: Item, icon_name: str, color_scheme: str, dialog_title:
                     )
                 ),
                 rx.dialog.close(
-                    rx.button("Close Dialog", size="2", color_scheme=color_scheme),
+                    rx.button(
+                        "Close Dialog",
+                        size="2",
+                        color_scheme=rx.match(
+                            TableState.dialog_action,
+                            *[(action, color_scheme) for action, (_, color_scheme, _) in DIALOG_ACTIONS.items()],
+                            "gray",
+                        ),
+                    ),
                 ),
             ),
         ),
+        open=TableState.dialog_open,
+        on_open_change=TableState.change_dialog_open,
     )
 
 
-def _delete_dialog(item: Item) -> rx.Component:
-    return _create_dialog(item, "trash-2", "tomato", "Delete Dialog")
-
-
-def _approve_dialog(item: Item) -> rx.Component:
-    return _create_dialog(item, "check", "grass", "Approve Dialog")
-
-
-def _edit_dialog(item: Item) -> rx.Component:
-    return _create_dialog(item, "square-pen", "blue", "Edit Dialog")
-
-
-def _dialog_group(item: Item) -> rx.Component:
+def _action_group(item: Item) -> rx.Component:
     return rx.hstack(
-        _approve_dialog(item),
-        _edit_dialog(item),
-        _delete_dialog(item),
+        *[
+            rx.icon_button(
+                rx.icon(icon_name),
+                color_scheme=color_scheme,
+                size="2",
+                variant="solid",
+                on_click=[
+                    TableState.setvar("selected_id", item.pipeline),
+                    TableState.setvar("dialog_action", action),
+                ],
+            )
+            for action, (icon_name, color_scheme, _) in DIALOG_ACTIONS.items()
+        ],
         align="center",
         spacing="2",
         width="100%",
@@ -148,13 +251,15 @@ def _header_cell(text: str, icon: str) -> rx.Component:
 
 
 def _show_item(item: Item, index: int) -> rx.Component:
+    # Rows keep their colors while the window moves
+    even = (index + TableState.window_start) % 2 == 0
     bg_color = rx.cond(
-        index % 2 == 0,
+        even,
         rx.color("gray", 1),
         rx.color("accent", 2),
     )
     hover_color = rx.cond(
-        index % 2 == 0,
+        even,
         rx.color("gray", 3),
         rx.color("accent", 3),
     )
@@ -164,8 +269,9 @@ def _show_item(item: Item, index: int) -> rx.Component:
         rx.table.cell(status_badge(item.status)),
         rx.table.cell(item.timestamp),
         rx.table.cell(item.duration),
-        rx.table.cell(_dialog_group(item)),
+        rx.table.cell(_action_group(item)),
         style={"_hover": {"bg": hover_color}, "bg": bg_color},
+        height=f"{ROW_HEIGHT}px",
         align="center",
     )
 
@@ -229,7 +335,86 @@ def _pagination_view() -> rx.Component:
     )
 
 
-def table() -> rx.Component:
+def _search_input(debounce_ms: int) -> rx.Component:
+    # Keystrokes are buffered on the client, a burst of typing sends a single search event
+    return rx.debounce_input(
+        rx.input(
+            rx.input.slot(rx.icon("search")),
+            rx.input.slot(
+                rx.icon("x"),
+                justify="end",
+                cursor="pointer",
+                on_click=TableState.clear_search_value,
+                display=rx.cond(TableState.search_value, "flex", "none"),
+            ),
+            placeholder="Search here...",
+            size="3",
+            max_width=["150px", "150px", "200px", "250px"],
+            width="100%",
+            variant="surface",
+            color_scheme="gray",
+            on_change=TableState.set_search_value,
+        ),
+        value=TableState.search_value,
+        debounce_timeout=debounce_ms,
+    )
+
+
+def _on_scroll() -> rx.event.EventSpec:
+    # The client computes the first visible row, the server only moves the window
+    first_visible_row = rx.Var.create_safe(
+        f"Math.floor(document.getElementById('{TABLE_WINDOW_ID}').scrollTop / {ROW_HEIGHT})",
+        _var_is_local=False,
+        _var_is_string=False,
+    )
+    handler: rx.event.EventHandler = TableState.set_first_visible_row  # type: ignore[assignment]
+    return handler(first_visible_row).debounce(SCROLL_DEBOUNCE_MS)
+
+
+def table(
+    search_debounce_ms: int = 300,
+    window_size: int = 0,
+    window_height: str = "70vh",
+    infinite: bool = False,
+    page_size: int = 0,
+) -> rx.Component:
+    """The table with search, sorting and pagination.
+
+    Args:
+        search_debounce_ms: Delay after the last keystroke before the search is sent to the server.
+        window_size: Number of rows mounted at once, 0 mounts the whole page. With a window the
+            table scrolls within `window_height` and only the rows around the scroll position are
+            sent to the client, which keeps large pages smooth.
+        window_height: Height of the scrollable table in the windowed mode.
+        infinite: Whether to replace the pagination with infinite scroll, the next rows are
+            loaded when the window reaches the end of the loaded ones. Requires a window.
+        page_size: Number of rows per page, 0 keeps the state default. Windowed tables can use
+            pages of hundreds of rows.
+
+    Returns:
+        The table component.
+    """
+    window_props = (
+        {
+            "id": TABLE_WINDOW_ID,
+            "max_height": window_height,
+            "overflow_y": "auto",
+            "on_scroll": _on_scroll(),
+        }
+        if window_size
+        else {}
+    )
+    mount_events = []
+    if page_size:
+        mount_events.append(TableState.setvar("limit", page_size))
+    if window_size:
+        mount_events += [
+            TableState.setvar("window_size", window_size),
+            TableState.setvar("infinite", infinite),
+        ]
+    if mount_events:
+        # The first page is loaded once the page size and the window are known
+        mount_events.append(TableState.load_items)
     return rx.box(
         rx.flex(
             rx.flex(
@@ -253,35 +438,12 @@ def table() -> rx.Component:
                     ),
                 ),
                 rx.select(
-                    [
-                        "pipeline",
-                        "status",
-                        "workflow",
-                        "timestamp",
-                        "duration",
-                    ],
+                    Item.sort_attributes(),
                     placeholder="Sort By: Pipeline",
                     size="3",
                     on_change=TableState.set_sort_value,
                 ),
-                rx.input(
-                    rx.input.slot(rx.icon("search")),
-                    rx.input.slot(
-                        rx.icon("x"),
-                        justify="end",
-                        cursor="pointer",
-                        on_click=TableState.setvar("search_value", ""),
-                        display=rx.cond(TableState.search_value, "flex", "none"),
-                    ),
-                    value=TableState.search_value,
-                    placeholder="Search here...",
-                    size="3",
-                    max_width=["150px", "150px", "200px", "250px"],
-                    width="100%",
-                    variant="surface",
-                    color_scheme="gray",
-                    on_change=TableState.set_search_value,
-                ),
+                _search_input(search_debounce_ms),
                 align="center",
                 justify="end",
                 spacing="3",
@@ -292,27 +454,35 @@ def table() -> rx.Component:
             width="100%",
             padding_bottom="1em",
         ),
-        rx.table.root(
-            rx.table.header(
-                rx.table.row(
-                    _header_cell("Pipeline", "route"),
-                    _header_cell("Workflow", "list-checks"),
-                    _header_cell("Status", "notebook-pen"),
-                    _header_cell("Timestamp", "calendar"),
-                    _header_cell("Duration", "clock"),
-                    _header_cell("Action", "cog"),
+        rx.box(
+            rx.table.root(
+                rx.table.header(
+                    rx.table.row(
+                        _header_cell("Pipeline", "route"),
+                        _header_cell("Workflow", "list-checks"),
+                        _header_cell("Status", "notebook-pen"),
+                        _header_cell("Timestamp", "calendar"),
+                        _header_cell("Duration", "clock"),
+                        _header_cell("Action", "cog"),
+                    ),
                 ),
+                rx.table.body(
+                    # Spacers stand in for the rows outside of the window
+                    rx.table.row(height=TableState.top_spacer_height),
+                    rx.foreach(
+                        TableState.visible_items,
+                        lambda item, index: _show_item(item, index),
+                    ),
+                    rx.table.row(height=TableState.bottom_spacer_height),
+                ),
+                variant="surface",
+                size="3",
+                width="100%",
             ),
-            rx.table.body(
-                rx.foreach(
-                    TableState.get_current_page,
-                    lambda item, index: _show_item(item, index),
-                )
-            ),
-            variant="surface",
-            size="3",
-            width="100%",
+            **window_props,
         ),
-        _pagination_view(),
+        _item_dialog(),
+        rx.text(TableState.loaded_label, margin_top="1em") if infinite else _pagination_view(),
         width="100%",
+        **({"on_mount": mount_events} if mount_events else {}),
     )
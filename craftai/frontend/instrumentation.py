@@ -0,0 +1,107 @@
+"""Latency instrumentation of the state event handlers and computed vars."""
+
+import hmac
+import os
+import time
+from typing import Any
+
+import reflex as rx
+from fastapi import Request
+from fastapi.responses import PlainTextResponse, Response
+from reflex.event import Event, get_hydrate_event
+from reflex.state import BaseState, StateUpdate
+from reflex.utils import format
+from reflex.vars import ComputedVar
+
+from craftai.backend.metrics import Metrics, metrics
+
+METRICS_ENDPOINT = "/metrics"
+# Set to 1 to record the metrics, the instrumentation adds overhead to every event
+METRICS_ENV = "CRAFTAI_METRICS"
+# When set, the metrics endpoint requires it as a bearer token
+METRICS_TOKEN_ENV = "CRAFTAI_METRICS_TOKEN"
+
+# Start time and delta bytes of the events being processed, keyed by the event object
+_events_in_progress: dict[int, tuple[float, int]] = {}
+
+
+def _handler_name(state: BaseState, event: Event) -> str:
+    *state_path, handler = event.name.split(".")
+    try:
+        state_cls = type(state.get_substate(state_path[1:]))
+    except ValueError:
+        return event.name
+    return f"{state_cls.__module__}.{state_cls.__qualname__}.{handler}"
+
+
+class MetricsMiddleware(rx.Middleware):
+    """Records the latency and the delta size of every event, background events included."""
+
+    async def preprocess(self, app: rx.App, state: BaseState, event: Event) -> StateUpdate | None:
+        # The hydrate event is answered by the hydrate middleware, it is never postprocessed
+        if event.name != get_hydrate_event(state):
+            _events_in_progress[id(event)] = (time.perf_counter(), 0)
+        return None
+
+    async def postprocess(self, app: rx.App, state: BaseState, event: Event, update: StateUpdate) -> StateUpdate:
+        in_progress = _events_in_progress.get(id(event))
+        if in_progress is None:
+            return update
+        started, delta_bytes = in_progress
+        delta_bytes += len(format.json_dumps(update.delta).encode()) if update.delta else 0
+        if not update.final:
+            _events_in_progress[id(event)] = (started, delta_bytes)
+            return update
+        del _events_in_progress[id(event)]
+        metrics.observe("event", _handler_name(state, event), time.perf_counter() - started, delta_bytes)
+        return update
+
+
+def _timed_computed_var_get(get: Any, registry: Metrics) -> Any:
+    def _get(self: ComputedVar, instance: BaseState | None, owner: type) -> Any:
+        if instance is None or (
+            self._cache and hasattr(instance, self._cache_attr) and not self.needs_update(instance)
+        ):
+            return get(self, instance, owner)
+        start = time.perf_counter()
+        try:
+            return get(self, instance, owner)
+        finally:
+            name = f"{owner.__module__}.{owner.__qualname__}.{self._var_name}"
+            registry.observe("computed_var", name, time.perf_counter() - start)
+
+    _get._craftai_timed = True  # type: ignore[attr-defined]
+    return _get
+
+
+def instrument_computed_vars(registry: Metrics = metrics) -> None:
+    """Time every computation of a computed var, reads of a cached value are not counted."""
+    if getattr(ComputedVar.__get__, "_craftai_timed", False):
+        return
+    # Patched on the class, a wrapped getter would hide the dependencies of cached vars
+    ComputedVar.__get__ = _timed_computed_var_get(ComputedVar.__get__, registry)  # type: ignore[method-assign]
+
+
+def metrics_enabled() -> bool:
+    return os.environ.get(METRICS_ENV, "0") == "1"
+
+
+def metrics_token_valid(token: str) -> bool:
+    """Whether the token grants access to the metrics, any token does when none is configured."""
+    expected = os.environ.get(METRICS_TOKEN_ENV)
+    return not expected or hmac.compare_digest(token.encode(), expected.encode())
+
+
+async def _metrics_endpoint(request: Request) -> Response:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if not metrics_token_valid(token if scheme == "Bearer" else ""):
+        return PlainTextResponse("Unauthorized", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    return PlainTextResponse(metrics.prometheus())
+
+
+def instrument(app: rx.App) -> None:
+    """Record handler metrics of the app and expose them on the metrics endpoint."""
+    # First, the app stops postprocessing at the first middleware which returns an update
+    app.add_middleware(MetricsMiddleware(), index=0)
+    instrument_computed_vars()
+    app.api.add_api_route(METRICS_ENDPOINT, _metrics_endpoint, methods=["GET"])
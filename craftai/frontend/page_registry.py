@@ -0,0 +1,107 @@
+"""Registry of the page modules of the app, imported on demand and timed."""
+
+import contextlib
+import dataclasses
+import importlib
+import os
+import time
+from collections.abc import Iterator, Mapping
+
+from reflex.utils import console
+from reflex.utils.format import format_route
+
+# Comma separated routes to load, all pages are loaded when it is not set
+PAGES_ENV = "CRAFTAI_PAGES"
+
+
+@dataclasses.dataclass
+class PageTiming:
+    """Startup cost of a single page module."""
+
+    module: str
+    routes: list[str] = dataclasses.field(default_factory=list)
+    import_seconds: float = 0.0
+    # Time spent building the component trees of the pages, when the app adds them
+    build_seconds: float = 0.0
+
+
+class PageRegistry:
+    """Page modules keyed by their routes.
+
+    The routes are declared up front, so the app can decide which page modules to import
+    without importing them. `template` records the pages a module defines and times how long
+    building their components takes.
+    """
+
+    def __init__(self) -> None:
+        self._modules: dict[str, str] = {}
+        self._timings: dict[str, PageTiming] = {}
+
+    def declare(self, pages: Mapping[str, str]) -> None:
+        """Declare the page modules, keyed by route."""
+        self._modules.update(pages)
+
+    def _timing(self, module: str) -> PageTiming:
+        return self._timings.setdefault(module, PageTiming(module))
+
+    def record(self, route: str, module: str) -> None:
+        routes = self._timing(module).routes
+        if route not in routes:
+            routes.append(route)
+
+    def module_of(self, route: str) -> str:
+        """Module which defines the page, the route may be in the format of `App.pages`."""
+        for timing in self._timings.values():
+            if any(format_route(recorded) == format_route(route) for recorded in timing.routes):
+                return timing.module
+        return ""
+
+    @contextlib.contextmanager
+    def time_build(self, module: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._timing(module).build_seconds += time.perf_counter() - start
+
+    def load(self, routes: list[str] | None = None) -> None:
+        """Import the modules of the routes, all declared routes by default.
+
+        Without routes, the `CRAFTAI_PAGES` environment variable can restrict the routes, so a
+        development server only pays for the pages being worked on.
+        """
+        if routes is None and os.environ.get(PAGES_ENV):
+            routes = [route.strip() for route in os.environ[PAGES_ENV].split(",")]
+        modules = dict.fromkeys(self._modules[route] for route in (routes or self._modules))
+        for module in modules:
+            self.import_module(module)
+
+    def import_module(self, module: str) -> None:
+        # Imports shared between pages are counted for the first page which imports them
+        timing = self._timing(module)
+        if timing.import_seconds:
+            return
+        start = time.perf_counter()
+        importlib.import_module(module)
+        timing.import_seconds = time.perf_counter() - start
+        console.debug(f"Imported page module {module} in {timing.import_seconds * 1000:.1f} ms")
+
+    def report(self) -> list[PageTiming]:
+        """Timings of the imported page modules, slowest first."""
+        return sorted(
+            self._timings.values(),
+            key=lambda timing: timing.import_seconds + timing.build_seconds,
+            reverse=True,
+        )
+
+    def format_report(self) -> str:
+        lines = [f"{'module':<48} {'import ms':>10} {'build ms':>10}  routes"]
+        for timing in self.report():
+            lines.append(
+                f"{timing.module:<48} {timing.import_seconds * 1000:>10.1f} {timing.build_seconds * 1000:>10.1f}"
+                f"  {', '.join(timing.routes)}"
+            )
+        return "\n".join(lines)
+
+
+page_registry = PageRegistry()
@@ -0,0 +1,104 @@
+"""Search, sorting and paging shared by the table states."""
+
+import asyncio
+from typing import Any
+
+import reflex as rx
+
+from craftai.backend.data_source.base import BaseDataSource, DataPage, DataQuery
+
+
+class PagedState(rx.State, mixin=True):  # type: ignore[call-arg]
+    """Mixin of states which show one page of a data source.
+
+    Filtering, sorting and paging are delegated to the data source returned by `_data_source`,
+    the states show the pages through `_set_page`. Every page load increments
+    `_load_generation`, a search which finishes after a newer load is dropped.
+    """
+
+    search_value: str = ""
+    sort_value: str = ""
+    sort_reverse: bool = False
+
+    total_items: int = 0
+    offset: int = 0
+    limit: int = 12  # Number of rows per page
+
+    # Incremented by every page load, a search finishing after a newer load is dropped
+    _load_generation: int = 0
+
+    def _data_source(self) -> BaseDataSource[Any]:
+        raise NotImplementedError
+
+    def _set_page(self, page: DataPage[Any]) -> None:
+        """Show the loaded page."""
+        raise NotImplementedError
+
+    def _page_query(self) -> DataQuery:
+        return DataQuery(
+            offset=self.offset,
+            limit=self.limit,
+            sort_value=self.sort_value,
+            sort_reverse=self.sort_reverse,
+            search_value=self.search_value,
+        )
+
+    @rx.var(cache=True)
+    def page_number(self) -> int:
+        return (self.offset // self.limit) + 1
+
+    @rx.var(cache=True)
+    def total_pages(self) -> int:
+        return (self.total_items // self.limit) + (1 if self.total_items % self.limit else 0)
+
+    def load_items(self) -> None:
+        self._load_generation += 1
+        self._set_page(self._data_source().query(self._page_query()))
+
+    def prev_page(self) -> None:
+        if self.page_number > 1:
+            self.offset -= self.limit
+            self.load_items()
+
+    def next_page(self) -> None:
+        if self.page_number < self.total_pages:
+            self.offset += self.limit
+            self.load_items()
+
+    def first_page(self) -> None:
+        self.offset = 0
+        self.load_items()
+
+    def last_page(self) -> None:
+        self.offset = max(self.total_pages - 1, 0) * self.limit
+        self.load_items()
+
+    def set_search_value(self, value: str) -> rx.event.EventHandler:
+        self.search_value = value
+        self.offset = 0
+        return type(self).search_items
+
+    @rx.background
+    async def search_items(self) -> None:
+        """Run the search query off the event loop, only the latest search is applied."""
+        async with self:
+            self._load_generation += 1
+            generation = self._load_generation
+            data_source = self._data_source()
+            query = self._page_query()
+
+        page = await asyncio.to_thread(data_source.query, query)
+
+        async with self:
+            if generation != self._load_generation:
+                # A newer search, sort or page load started meanwhile, its result wins
+                return
+            self._set_page(page)
+
+    def set_sort_value(self, value: str) -> None:
+        self.sort_value = value
+        self.load_items()
+
+    def toggle_sort(self) -> None:
+        self.sort_reverse = not self.sort_reverse
+        self.load_items()
@@ -1,4 +1,15 @@
-from .index import index
-from .settings import settings
+"""Pages of the app, the modules are imported through the page registry."""
 
-__all__ = ["index", "settings"]
+from craftai.frontend.instrumentation import metrics_enabled
+from craftai.frontend.page_registry import page_registry
+
+page_registry.declare(
+    {
+        "/": "craftai.frontend.pages.index",
+        "/settings": "craftai.frontend.pages.settings",
+        "/connectors": "craftai.frontend.pages.connectors.list",
+    }
+)
+# The metrics are only recorded when enabled, the page is only added then
+if metrics_enabled():
+    page_registry.declare({"/admin/metrics": "craftai.frontend.pages.metrics"})
@@ -1,84 +1,177 @@
 """The connectors list page."""
 
+import json
+
 import reflex as rx
 
-from craftai.entities.connector import Connector
+from craftai.backend.connectors.health import STATUS_UNKNOWN
+from craftai.backend.connectors.store import connectors_source, status_poller
+from craftai.backend.data_source.base import BaseDataSource, DataPage
+from craftai.entities.connector import Connector, ConnectorRow
+from craftai.frontend.components.status_badge import status_badge
+from craftai.frontend.paged_state import PagedState
+from craftai.frontend.sessions import SessionGroup
 from craftai.frontend.templates.main import template
 
-
-@template(route="/connectors", title="Connectors")
-def list_route() -> rx.Component:
-    """The connectors page."""
-    return rx.vstack(
-        rx.heading("Connectors", size="5"),
-        spacing="8",
-        width="100%",
-    )
+# Rows of the page are kept in slot vars and a connector keeps its slot while it stays on the
+# page, so a change to one row only sends that slot to the client instead of the whole page.
+ROW_SLOTS = 12
 
 
-class TableState(rx.State):
+class TableState(PagedState, rx.State):
     """The state class."""
 
-    items: list[Connector] = []
-
-    search_value: str = ""
-    sort_value: str = ""
-    sort_reverse: bool = False
-
-    total_items: int = 0
-    offset: int = 0
-    limit: int = 12  # Number of rows per page
-
-    @rx.var(cache=True)
-    def filtered_sorted_items(self) -> list[Connector]:
-        items = self.items
-
-        # Filter items based on selected item
-        if self.sort_value:
-            items = sorted(
-                items,
-                key=lambda item: str(getattr(item, self.sort_value)).lower(),
-                reverse=self.sort_reverse,
-            )
-
-        # Filter items based on search value
-        if self.search_value:
-            search_value = self.search_value.lower()
-            items = [item for item in items if item.check_search_string(search_value)]
-
-        return items
-
-    @rx.var(cache=True)
-    def page_number(self) -> int:
-        return (self.offset // self.limit) + 1
-
-    @rx.var(cache=True)
-    def total_pages(self) -> int:
-        return (self.total_items // self.limit) + (1 if self.total_items % self.limit else 0)
-
-    @rx.var(cache=True, initial_value=[])
-    def get_current_page(self) -> list[Connector]:
-        start_index = self.offset
-        end_index = start_index + self.limit
-        return self.filtered_sorted_items[start_index:end_index]
+    # Slots of the page rows in display order, the slot vars are added below the class
+    row_order: list[int] = []
+    _slot_ids: dict[str, int] = {}
+
+    limit: int = ROW_SLOTS  # Number of rows per page
+
+    # Connector opened in the details dialog, loaded from the data source when it is opened
+    selected_id: str = ""
+    # Incremented when the connectors change, so the open connector is loaded again
+    _connectors_version: int = 0
+
+    def _data_source(self) -> BaseDataSource[Connector]:
+        return connectors_source
+
+    # Both vars read the connector from the shared cache, it is not kept in the session
+    @rx.var(cache=True, deps=["_connectors_version"])
+    def selected_row(self) -> ConnectorRow | None:
+        """Name and type of the open connector, its config is only sent in `selected_config`."""
+        if not self.selected_id:
+            return None
+        connector = connectors_source.get(self.selected_id)
+        return connector.row() if connector else None
+
+    @rx.var(cache=True, deps=["_connectors_version"])
+    def selected_config(self) -> str:
+        if not self.selected_id:
+            return ""
+        connector = connectors_source.get(self.selected_id)
+        return json.dumps(connector.connector_data, indent=2) if connector else ""
+
+    def change_dialog_open(self, value: bool) -> None:
+        if not value:
+            self.selected_id = ""
+
+    def _set_slot(self, name: str, slot: int, value: object) -> None:
+        var_name = f"{name}_{slot}"
+        if getattr(self, var_name) != value:
+            setattr(self, var_name, value)
+
+    def _show_page(self, items: list[Connector]) -> None:
+        """Put the page items into the row slots, only the changed slots are sent.
+
+        The slots hold `ConnectorRow` projections, the configs of the connectors are neither
+        kept in the session nor sent to the client.
+        """
+        page_ids = [item.list_id() for item in items]
+        slot_ids = {item_id: slot for item_id, slot in self._slot_ids.items() if item_id in page_ids}
+        free_slots = sorted(set(range(ROW_SLOTS)) - set(slot_ids.values()))
+        for item_id, item in zip(page_ids, items):
+            if item_id not in slot_ids:
+                slot_ids[item_id] = free_slots.pop(0)
+            self._set_slot("row", slot_ids[item_id], item.row())
+            self._set_slot("status", slot_ids[item_id], status_poller.statuses.get(item_id, STATUS_UNKNOWN))
+        self._slot_ids = slot_ids
+        row_order = [slot_ids[item_id] for item_id in page_ids]
+        if self.row_order != row_order:
+            self.row_order = row_order
+
+    def _apply_statuses(self) -> None:
+        for item_id, slot in self._slot_ids.items():
+            self._set_slot("status", slot, status_poller.statuses.get(item_id, STATUS_UNKNOWN))
+
+    def _refresh_rows(self) -> None:
+        self._connectors_version += 1
+        page = self._data_source().query(self._page_query())
+        self._show_page(page.items)
+        if self.total_items != page.total:
+            self.total_items = page.total
+
+    def _set_page(self, page: DataPage[Connector]) -> None:
+        self._show_page(page.items)
+        self.total_items = page.total
+
+    def watch_changes(self) -> None:
+        """Keep the page of this session up to date with the connectors and their health."""
+        connector_sessions.add(self)
+        connector_sessions.follow(connectors_source.changes, TableState._refresh_rows)
+        connector_sessions.follow(status_poller.changes, TableState._apply_statuses)
+        status_poller.start()
+
+
+for _slot in range(ROW_SLOTS):
+    TableState.add_var(f"row_{_slot}", ConnectorRow | None, None)
+    TableState.add_var(f"status_{_slot}", str, STATUS_UNKNOWN)
+
+connector_sessions = SessionGroup(TableState)
+
+
+def _show_connector(connector: rx.Var, status: rx.Var) -> rx.Component:
+    return rx.table.row(
+        rx.table.row_header_cell(connector.name),
+        rx.table.cell(connector.connector_type),
+        rx.table.cell(status_badge(status)),
+        align="center",
+        cursor="pointer",
+        on_click=TableState.setvar("selected_id", connector.name),
+    )
 
-    def prev_page(self) -> None:
-        if self.page_number > 1:
-            self.offset -= self.limit
 
-    def next_page(self) -> None:
-        if self.page_number < self.total_pages:
-            self.offset += self.limit
+def _connector_dialog() -> rx.Component:
+    # A single dialog shared by all rows, the full connector is only loaded while it is open
+    connector = TableState.selected_row
+    return rx.dialog.root(
+        rx.dialog.content(
+            rx.vstack(
+                rx.dialog.title(connector.name),
+                rx.dialog.description(connector.connector_type),
+                rx.code_block(TableState.selected_config, language="json", width="100%"),
+                rx.dialog.close(rx.button("Close", size="2", variant="soft", color_scheme="gray")),
+                width="100%",
+            ),
+        ),
+        open=TableState.selected_id != "",
+        on_open_change=TableState.change_dialog_open,
+    )
 
-    def first_page(self) -> None:
-        self.offset = 0
 
-    def last_page(self) -> None:
-        self.offset = (self.total_pages - 1) * self.limit
+def _show_slot(slot: rx.Var[int]) -> rx.Component:
+    return rx.match(
+        slot,
+        *[
+            (index, _show_connector(getattr(TableState, f"row_{index}"), getattr(TableState, f"status_{index}")))
+            for index in range(ROW_SLOTS)
+        ],
+        rx.fragment(),
+    )
 
-    def load_items(self) -> None:
-        pass
 
-    def toggle_sort(self) -> None:
-        self.sort_reverse = not self.sort_reverse
-        self.load_items()
+@template(
+    route="/connectors",
+    title="Connectors",
+    on_load=[TableState.load_items, TableState.watch_changes],
+)
+def list_route() -> rx.Component:
+    """The connectors page."""
+    return rx.vstack(
+        rx.heading("Connectors", size="5"),
+        rx.table.root(
+            rx.table.header(
+                rx.table.row(
+                    rx.table.column_header_cell("Name"),
+                    rx.table.column_header_cell("Type"),
+                    rx.table.column_header_cell("Status"),
+                ),
+            ),
+            rx.table.body(rx.foreach(TableState.row_order, _show_slot)),
+            variant="surface",
+            size="3",
+            width="100%",
+        ),
+        _connector_dialog(),
+        spacing="8",
+        width="100%",
+    )
@@ -0,0 +1,118 @@
+"""The handler metrics admin page."""
+
+from typing import Any
+
+import reflex as rx
+
+from craftai.backend.metrics import metrics
+from craftai.frontend.instrumentation import METRICS_ENDPOINT, METRICS_ENV, METRICS_TOKEN_ENV, metrics_token_valid
+from craftai.frontend.templates.main import template
+
+
+class MetricRow(rx.Base):
+    kind: str
+    name: str
+    count: int
+    mean_ms: str
+    p50_ms: str
+    p99_ms: str
+    max_ms: str
+    delta_kb: str
+
+
+class MetricsState(rx.State):
+    """The state class."""
+
+    rows: list[MetricRow] = []
+    # Whether the session entered the metrics token, the page is open when none is configured
+    authorized: bool = False
+
+    def authorize(self, form_data: dict[str, Any]) -> None:
+        self.authorized = metrics_token_valid(form_data.get("token", ""))
+        self.load_metrics()
+
+    def load_metrics(self) -> None:
+        if not self.authorized:
+            self.authorized = metrics_token_valid("")
+        if not self.authorized:
+            return
+        self.rows = [
+            MetricRow(
+                kind=stats.kind,
+                name=stats.name,
+                count=stats.latency.count,
+                mean_ms=f"{stats.latency.total / stats.latency.count * 1000:.2f}",
+                p50_ms=f"{stats.latency.quantile(0.5) * 1000:.2f}",
+                p99_ms=f"{stats.latency.quantile(0.99) * 1000:.2f}",
+                max_ms=f"{stats.latency.maximum * 1000:.2f}",
+                delta_kb=f"{stats.delta_bytes / 1024:.1f}",
+            )
+            for stats in metrics.snapshot()
+        ]
+
+
+def _show_row(row: MetricRow) -> rx.Component:
+    return rx.table.row(
+        rx.table.row_header_cell(rx.code(row.name)),
+        rx.table.cell(row.kind),
+        rx.table.cell(row.count),
+        rx.table.cell(row.mean_ms),
+        rx.table.cell(row.p50_ms),
+        rx.table.cell(row.p99_ms),
+        rx.table.cell(row.max_ms),
+        rx.table.cell(row.delta_kb),
+        align="center",
+    )
+
+
+def _token_form() -> rx.Component:
+    return rx.form(
+        rx.hstack(
+            rx.input(name="token", type="password", placeholder=f"Token of {METRICS_TOKEN_ENV}", width="24em"),
+            rx.button("Show metrics", type="submit"),
+        ),
+        on_submit=MetricsState.authorize,
+        reset_on_submit=True,
+    )
+
+
+def _metrics_view() -> rx.Component:
+    return rx.vstack(
+        rx.hstack(
+            rx.heading("Handler metrics", size="5"),
+            rx.spacer(),
+            rx.button(rx.icon("refresh-cw", size=16), "Refresh", on_click=MetricsState.load_metrics),
+            align="center",
+            width="100%",
+        ),
+        rx.text(
+            f"Latencies of this worker since its start, recorded when {METRICS_ENV}=1. Scraped at {METRICS_ENDPOINT}.",
+            color_scheme="gray",
+        ),
+        rx.table.root(
+            rx.table.header(
+                rx.table.row(
+                    rx.table.column_header_cell("Handler"),
+                    rx.table.column_header_cell("Kind"),
+                    rx.table.column_header_cell("Calls"),
+                    rx.table.column_header_cell("Mean ms"),
+                    rx.table.column_header_cell("p50 ms"),
+                    rx.table.column_header_cell("p99 ms"),
+                    rx.table.column_header_cell("Max ms"),
+                    rx.table.column_header_cell("Delta KiB"),
+                ),
+            ),
+            rx.table.body(rx.foreach(MetricsState.rows, _show_row)),
+            variant="surface",
+            size="2",
+            width="100%",
+        ),
+        spacing="6",
+        width="100%",
+    )
+
+
+@template(route="/admin/metrics", title="Metrics", on_load=MetricsState.load_metrics)
+def metrics_page() -> rx.Component:
+    """The metrics page, it asks for the metrics token when one is configured."""
+    return rx.cond(MetricsState.authorized, _metrics_view(), _token_form())
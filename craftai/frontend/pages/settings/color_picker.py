@@ -16,16 +16,16 @@ secondary_color_dict: dict[str, str] = {
 }
 
 
-class ColorPickerState(rx.State):
-    primary_color_options: dict[str, str] = primary_color_dict
-    secondary_color_options: dict[str, str] = secondary_color_dict
+# The options are constant, they are compiled into the page instead of being sent as state
+primary_color_options: rx.Var = rx.Var.create_safe(primary_color_dict)._replace(_var_type=dict[str, str])
+secondary_color_options: rx.Var = rx.Var.create_safe(secondary_color_dict)._replace(_var_type=dict[str, str])
 
 
-def _display_primary_color(color: list) -> rx.Component:
+def _display_color(color: rx.Var, selected_color: rx.Var, var_name: str) -> rx.Component:
     return rx.tooltip(
         rx.box(
             rx.cond(
-                color[0].lower() == ThemeState.accent_color.lower(),
+                color[0].lower() == selected_color.lower(),
                 rx.box(
                     rx.icon("check", color=rx.color("gray", 12)),
                     bg=color[1],
@@ -41,41 +41,15 @@ def _display_primary_color(color: list) -> rx.Component:
                     style=styles.color_picker_style,
                 ),
             ),
-            on_click=ThemeState.setvar("accent_color", color[0].lower()),
+            on_click=ThemeState.setvar(var_name, color[0].lower()),
         ),
         content=color[0],
     )
 
 
-def _display_secondary_color(colors: list) -> rx.Component:
-    return rx.tooltip(
-        rx.box(
-            rx.cond(
-                colors[0].lower() == ThemeState.gray_color.lower(),
-                rx.box(
-                    rx.icon("check", color=rx.color("gray", 12)),
-                    bg=colors[1],
-                    height=styles.color_box_size,
-                    width=styles.color_box_size,
-                    border=f"2px solid  {rx.color('gray', 12)}",
-                    style=styles.color_picker_style,
-                ),
-                rx.box(
-                    bg=colors[1],
-                    height=styles.color_box_size,
-                    width=styles.color_box_size,
-                    style=styles.color_picker_style,
-                ),
-            ),
-            on_click=ThemeState.setvar("gray_color", colors[0].lower()),
-        ),
-        content=colors[0],
-    )
-
-
-def primary_color_picker() -> rx.Component:
+def _color_grid(options: rx.Var, selected_color: rx.Var, var_name: str) -> rx.Component:
     return rx.flex(
-        rx.foreach(ColorPickerState.primary_color_options, _display_primary_color),
+        rx.foreach(options, lambda color: _display_color(color, selected_color, var_name)),
         width="100%",
         max_width="40rem",
         wrap="wrap",
@@ -83,11 +57,12 @@ def primary_color_picker() -> rx.Component:
     )
 
 
+# The grids are memoized, so their swatches are compiled once into the shared components
+@rx.memo
+def primary_color_picker() -> rx.Component:
+    return _color_grid(primary_color_options, ThemeState.accent_color, "accent_color")
+
+
+@rx.memo
 def secondary_color_picker() -> rx.Component:
-    return rx.flex(
-        rx.foreach(ColorPickerState.secondary_color_options, _display_secondary_color),
-        width="100%",
-        max_width="40rem",
-        wrap="wrap",
-        gap=["15px", "15px", "20px"],
-    )
+    return _color_grid(secondary_color_options, ThemeState.gray_color, "gray_color")
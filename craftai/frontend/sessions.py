@@ -0,0 +1,82 @@
+"""Pushing state updates to connected sessions out of band."""
+
+import asyncio
+from collections.abc import Callable
+from typing import Any, Generic, TypeVar, cast
+
+import reflex as rx
+from reflex.utils import console
+
+from craftai.backend.data_source.changes import ChangeFeed
+
+StateT = TypeVar("StateT", bound=rx.State)
+
+# Number of sessions updated at the same time
+MAX_CONCURRENT_UPDATES = 32
+
+
+def _get_app() -> rx.App:
+    # The app module imports the pages, so it can only be imported once they are loaded
+    from craftai.craftai import app
+
+    return app
+
+
+class SessionGroup(Generic[StateT]):
+    """Sessions of a state which receive updates pushed by the server.
+
+    Sessions join the group from an event handler. Sessions which have disconnected are
+    dropped on the next push.
+    """
+
+    def __init__(self, state_cls: type[StateT]):
+        self.state_cls = state_cls
+        self._tokens: set[str] = set()
+        self._tasks: dict[int, asyncio.Task[None]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def add(self, state: rx.State) -> None:
+        self._tokens.add(state.router.session.client_token)
+
+    def discard(self, token: str) -> None:
+        self._tokens.discard(token)
+
+    async def push(self, update: Callable[[StateT], Any]) -> None:
+        """Apply the update to the state of every connected session and send the delta."""
+        app = _get_app()
+        connected = app.event_namespace.token_to_sid if app.event_namespace else {}
+        for token in self._tokens - connected.keys():
+            self.discard(token)
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_UPDATES)
+
+        async def _push(token: str) -> None:
+            try:
+                async with semaphore, app.modify_state(f"{token}_{self.state_cls.get_full_name()}") as root:
+                    update(cast(StateT, await root.get_state(self.state_cls)))
+            except Exception as e:
+                # A failing session must not keep the others from their updates
+                console.error(f"Pushing an update to session {token} failed: {e!r}")
+
+        await asyncio.gather(*(_push(token) for token in list(self._tokens)))
+
+    def follow(self, feed: ChangeFeed[Any], update: Callable[[StateT], Any]) -> None:
+        """Push the update for every batch of changes from the feed.
+
+        The feed is consumed by a single task shared by all sessions, started by the first call
+        with it.
+        """
+        task = self._tasks.get(id(feed))
+        if task is not None and not task.done():
+            return
+
+        async def _follow() -> None:
+            async for _ in feed.subscribe():
+                try:
+                    await self.push(update)
+                except Exception as e:
+                    console.error(f"Pushing changes to the sessions of {self.state_cls.get_full_name()} failed: {e!r}")
+
+        self._tasks[id(feed)] = asyncio.create_task(_follow())
@@ -0,0 +1,176 @@
+"""Serialization of states which keep large lists.
+
+The Redis state manager pickles a state whenever an event changes it. A state keeping a large
+list pays for pickling, sending and unpickling the whole list on every event, even when the event
+only changed the search value. States mixing in `OutOfBandLists` store their lists through a
+`ListSerializer` instead, the pickled state only keeps a reference to them.
+"""
+
+import abc
+import hashlib
+import pickle
+import time
+from collections.abc import Callable
+from typing import Any, ClassVar
+
+import reflex as rx
+from reflex.utils import console
+
+from craftai.backend.shared_cache import DEFAULT_PREFIX, SWEEP_INTERVAL, CacheBackend, cache_backend
+
+
+class ListSerializer(abc.ABC):
+    """Stores the lists of states, what `dump` returns is pickled with the state in place of the list."""
+
+    @abc.abstractmethod
+    def dump(self, values: list[Any]) -> Any:
+        pass
+
+    @abc.abstractmethod
+    def load(self, stored: Any) -> list[Any] | None:
+        """The stored list, None when it was lost, e.g. because it expired."""
+
+    def keep(self, stored: Any) -> None:
+        """Keep the stored list of a state persisted again without changing the list."""
+
+
+class InlineListSerializer(ListSerializer):
+    """Keeps the lists in the pickled state, as the state manager does without a serializer."""
+
+    def dump(self, values: list[Any]) -> Any:
+        return values
+
+    def load(self, stored: Any) -> list[Any] | None:
+        return list(stored)
+
+
+class CacheListSerializer(ListSerializer):
+    """Stores the lists in a cache backend, keyed by the hash of their content.
+
+    Sessions which show the same rows share a single entry. Entries expire after `ttl` seconds,
+    which should outlive the states, persists of a state extend the entries it refers to. States
+    are pickled on the event loop, so an entry is extended at most once per `touch_interval`
+    seconds by this process, persists in between skip the round trip to the backend.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        ttl: float,
+        prefix: str = f"{DEFAULT_PREFIX}:state-lists",
+        touch_interval: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backend = backend
+        self.ttl = ttl
+        self.prefix = prefix
+        self.touch_interval = ttl / 4 if touch_interval is None else touch_interval
+        self._clock = clock
+        # When this process last set or extended each entry
+        self._touched: dict[str, float] = {}
+        self._touches = 0
+
+    def _needs_touch(self, key: str) -> bool:
+        touched = self._touched.get(key)
+        return touched is None or self._clock() - touched >= self.touch_interval
+
+    def _mark_touched(self, key: str) -> None:
+        now = self._clock()
+        self._touched[key] = now
+        self._touches += 1
+        if self._touches % SWEEP_INTERVAL == 0:
+            # Entries due for a touch are touched again anyway, only recent ones are worth keeping
+            self._touched = {key: at for key, at in self._touched.items() if now - at < self.touch_interval}
+
+    def dump(self, values: list[Any]) -> Any:
+        data = pickle.dumps(values, protocol=pickle.HIGHEST_PROTOCOL)
+        key = f"{self.prefix}:{hashlib.sha256(data).hexdigest()}"
+        if self._needs_touch(key):
+            if not self.backend.touch(key, self.ttl):
+                self.backend.set(key, data, self.ttl)
+            self._mark_touched(key)
+        return key
+
+    def load(self, stored: Any) -> list[Any] | None:
+        data = self.backend.get(stored)
+        if data is None:
+            return None
+        values: list[Any] = pickle.loads(data)
+        return values
+
+    def keep(self, stored: Any) -> None:
+        if self._needs_touch(stored):
+            self.backend.touch(stored, self.ttl)
+            self._mark_touched(stored)
+
+
+def default_list_serializer() -> ListSerializer:
+    """Out of band storage in Redis when the app keeps its states there.
+
+    The memory state manager never pickles the states, the lists stay inline.
+    """
+    config = rx.config.get_config()
+    if not config.redis_url:
+        return InlineListSerializer()
+    return CacheListSerializer(cache_backend(config.redis_url), ttl=2 * config.redis_token_expiration)
+
+
+list_serializer = default_list_serializer()
+
+
+class OutOfBandLists(rx.State, mixin=True):  # type: ignore[call-arg]
+    """Mixin of states whose backend list vars are pickled by reference.
+
+    `_out_of_band_lists` maps each list var to a version var, which the state increments whenever
+    it assigns the list. A list is dumped again only when its version changed, so events which
+    leave the list alone only pickle the scalar vars. Values of cached computed vars are dropped
+    from the pickle as well, they are recomputed from the loaded vars when read.
+
+    A list which outlived its stored copy is rebuilt by `_reload_list` when the state is loaded.
+    """
+
+    _out_of_band_lists: ClassVar[dict[str, str]] = {}
+    _list_serializer: ClassVar[ListSerializer] = list_serializer
+
+    # Version and stored reference of each list, as of the last persist of the state
+    _stored_lists: dict[str, tuple[int, Any]] = {}
+
+    def __getstate__(self) -> dict[str, Any]:
+        state = super().__getstate__()
+        values = state["__dict__"]
+        for computed_var in self.computed_vars.values():
+            values.pop(computed_var._cache_attr, None)
+
+        backend_vars = values["_backend_vars"] = dict(values["_backend_vars"])
+        stored_lists = dict(backend_vars["_stored_lists"])
+        for name, version_var in self._out_of_band_lists.items():
+            version = backend_vars[version_var]
+            stored = stored_lists.get(name)
+            if stored is not None and stored[0] == version:
+                self._list_serializer.keep(stored[1])
+            else:
+                stored = stored_lists[name] = (version, self._list_serializer.dump(backend_vars[name]))
+            backend_vars[name] = []
+        # Kept on the instance too, the next persist reuses the references of unchanged lists
+        self.__dict__["_backend_vars"]["_stored_lists"] = backend_vars["_stored_lists"] = stored_lists
+        return state
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        super().__setstate__(state)
+        backend_vars = self.__dict__["_backend_vars"]
+        stored_lists = backend_vars["_stored_lists"]
+        for name, (_, stored) in list(stored_lists.items()):
+            values = self._list_serializer.load(stored)
+            if values is None:
+                console.warn(f"State list {stored} has expired, it is reloaded.")
+                # Dumped again on the next persist, whatever its version
+                del stored_lists[name]
+                values = self._reload_list(name)
+            backend_vars[name] = values
+
+    def _reload_list(self, name: str) -> list[Any]:
+        """Rebuild a list var whose stored copy was lost, the other vars are already loaded.
+
+        Called while the state is unpickled, it must not assign vars through the state.
+        """
+        return []
@@ -7,6 +7,7 @@ import reflex as rx
 from craftai.frontend import styles
 from craftai.frontend.components.navbar import navbar
 from craftai.frontend.components.sidebar import sidebar
+from craftai.frontend.page_registry import page_registry
 
 # Meta tags for the app.
 default_meta = [
@@ -78,6 +79,10 @@ def template(
         # Get the meta tags for the page.
         all_meta = [*default_meta, *(meta or [])]
 
+        # Record the page for the startup report.
+        module = page_content.__module__
+        page_registry.record(route or f"/{page_content.__name__}", module)
+
         def templated_page() -> rx.Component:
             return rx.flex(
                 navbar(),
@@ -121,14 +126,15 @@ def template(
             on_load=on_load,
         )
         def theme_wrap() -> rx.Component:
-            return rx.theme(
-                templated_page(),
-                has_background=True,
-                accent_color=ThemeState.accent_color,
-                gray_color=ThemeState.gray_color,
-                radius=ThemeState.radius,
-                scaling=ThemeState.scaling,
-            )
+            with page_registry.time_build(module):
+                return rx.theme(
+                    templated_page(),
+                    has_background=True,
+                    accent_color=ThemeState.accent_color,
+                    gray_color=ThemeState.gray_color,
+                    radius=ThemeState.radius,
+                    scaling=ThemeState.scaling,
+                )
 
         return theme_wrap
 
@@ -0,0 +1,144 @@
+"""Startup profiling report of the app.
+
+Run `python -m craftai.profiling --output profile.json` from the project root. The report is
+JSON, so reports of two releases can be diffed.
+"""
+
+import argparse
+import dataclasses
+import json
+import platform
+import subprocess
+import sys
+import time
+from importlib.metadata import version
+from typing import Any
+
+APP_MODULE = "craftai.craftai"
+
+
+def import_times(module: str = APP_MODULE) -> list[dict[str, Any]]:
+    """Import time of every module imported by the module, slowest first.
+
+    Measured with `-X importtime` in a fresh interpreter, so modules imported by this process
+    do not hide their cost.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times.append({"module": name.strip(), "self_us": int(self_us), "cumulative_us": int(cumulative_us)})
+    return sorted(times, key=lambda entry: entry["cumulative_us"], reverse=True)
+
+
+def route_compile_times() -> list[dict[str, Any]]:
+    """Time to build and to compile each page registered through `template`."""
+    from reflex.compiler import compiler
+    from reflex.config import get_config
+    from reflex.page import DECORATED_PAGES
+
+    from craftai.craftai import app
+    from craftai.frontend.page_registry import page_registry
+
+    app._enable_state()
+    times = []
+    for render, kwargs in DECORATED_PAGES[get_config().app_name]:
+        routes = set(app.pages)
+        start = time.perf_counter()
+        app.add_page(render, **kwargs)
+        built = time.perf_counter()
+        for route in set(app.pages) - routes:
+            _, code = compiler.compile_page(route, app.pages[route], app.state)
+            times.append(
+                {
+                    "route": route,
+                    "module": page_registry.module_of(route),
+                    "build_seconds": built - start,
+                    "compile_seconds": time.perf_counter() - built,
+                    "code_bytes": len(code.encode()),
+                }
+            )
+
+    custom_components = set()
+    for component in app.pages.values():
+        custom_components |= component._get_all_custom_components()
+    start = time.perf_counter()
+    _, code, _ = compiler.compile_components(custom_components)
+    times.append(
+        {
+            "route": "",
+            "module": "custom components",
+            "build_seconds": 0.0,
+            "compile_seconds": time.perf_counter() - start,
+            "code_bytes": len(code.encode()),
+        }
+    )
+    return times
+
+
+def state_sizes() -> list[dict[str, Any]]:
+    """Number of vars of every state class and the size of its initial serialized state."""
+    from reflex.state import BaseState, State
+    from reflex.utils import format
+
+    root = State(_reflex_internal_init=True)
+    sizes = []
+
+    def _walk(state: BaseState) -> None:
+        state_cls = type(state)
+        name = state_cls.get_full_name()
+        sizes.append(
+            {
+                "state": name,
+                "base_vars": len(state_cls.base_vars),
+                "computed_vars": len(state_cls.computed_vars),
+                "backend_vars": len(state_cls.backend_vars),
+                "initial_bytes": len(format.json_dumps(state.dict(include_computed=False)[name]).encode()),
+            }
+        )
+        for substate in state.substates.values():
+            _walk(substate)
+
+    _walk(root)
+    return sizes
+
+
+def profile() -> dict[str, Any]:
+    start = time.perf_counter()
+    report: dict[str, Any] = {
+        "python": platform.python_version(),
+        "reflex": version("reflex"),
+        "imports": import_times(),
+    }
+
+    from craftai.frontend.page_registry import page_registry
+
+    report["routes"] = route_compile_times()
+    report["page_modules"] = [dataclasses.asdict(timing) for timing in page_registry.report()]
+    report["states"] = state_sizes()
+    report["total_seconds"] = time.perf_counter() - start
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="-", help="Path of the JSON report, `-` for stdout.")
+    args = parser.parse_args()
+
+    report = json.dumps(profile(), indent=2)
+    if args.output == "-":
+        print(report)
+    else:
+        with open(args.output, "w") as file:
+            file.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()